@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of rendered assets (images and videos)
+
+The key is a hash of everything that determines the output: the image prompt,
+model and transcode settings for images; the image bytes, title, audio track
+and template settings for videos. A hit returns the already uploaded blob URL,
+so retries and re-publishes skip the image API call or the render. Image bytes
+are also kept locally because video rendering needs them. Local copies are
+evicted least recently used first once their total size exceeds the budget;
+entries that only point at a blob cost no local space and are not counted.
+The blobs themselves are left in storage.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from config import ASSET_CACHE_ENABLED, ASSET_CACHE_DB_PATH, ASSET_CACHE_DIR, ASSET_CACHE_MAX_BYTES
+
+
+def asset_key(kind: str, **inputs: Any) -> str:
+    """Hash of an asset kind and its inputs (bytes values are hashed first)"""
+    normalized = {
+        name: hashlib.sha256(value).hexdigest() if isinstance(value, bytes) else value
+        for name, value in inputs.items()
+    }
+    payload = json.dumps({"kind": kind, **normalized}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AssetCache:
+    """SQLite index of key -> uploaded asset, with LRU eviction of local copies bounded by size"""
+
+    def __init__(self, db_path: str = ASSET_CACHE_DB_PATH, cache_dir: str = ASSET_CACHE_DIR,
+                 max_bytes: int = ASSET_CACHE_MAX_BYTES, enabled: bool = ASSET_CACHE_ENABLED):
+        self.db_path = db_path
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS assets (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                url TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                local_path TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_assets_used ON assets (last_used)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _local_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _write_local(self, key: str, data: bytes) -> str:
+        path = self._local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a private file first so readers never see a partial asset
+        partial_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        with open(partial_path, "wb") as f:
+            f.write(data)
+        os.replace(partial_path, path)
+        return path
+
+    def _delete_row(self, row: sqlite3.Row) -> None:
+        self._conn.execute("DELETE FROM assets WHERE key = ?", (row["key"],))
+        if row["local_path"] and os.path.exists(row["local_path"]):
+            os.unlink(row["local_path"])
+
+    def _local_bytes(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM assets WHERE local_path IS NOT NULL"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached asset as {"filename", "url", "data"} (data only for assets stored locally)
+
+        Entries whose local copy went missing count as misses.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM assets WHERE key = ?", (key,)).fetchone()
+            data = None
+            if row is not None and row["local_path"]:
+                try:
+                    with open(row["local_path"], "rb") as f:
+                        data = f.read()
+                except OSError:
+                    self._delete_row(row)
+                    self._conn.commit()
+                    row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE assets SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return {"filename": row["filename"], "url": row["url"], "data": data}
+
+    def put(self, key: str, kind: str, filename: str, url: str, size: int, data: Optional[bytes] = None) -> None:
+        """Record an uploaded asset (keeping data locally if given) and evict local copies down to max_bytes"""
+        if not self.enabled:
+            return
+        local_path = self._write_local(key, data) if data is not None else None
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO assets (key, kind, filename, url, size, local_path, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, filename, url, size, local_path, now, now)
+            )
+            total = self._local_bytes()
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT * FROM assets WHERE local_path IS NOT NULL ORDER BY last_used"
+                ).fetchall()
+                for row in rows:
+                    if total <= self.max_bytes or row["key"] == key:
+                        break
+                    self._delete_row(row)
+                    total -= row["size"]
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+            return {
+                "enabled": self.enabled,
+                "entries": entries,
+                "local_bytes": self._local_bytes(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+_asset_cache: Optional[AssetCache] = None
+_asset_cache_lock = threading.Lock()
+
+
+def get_asset_cache() -> AssetCache:
+    """Shared rendered-asset cache, opened on first use"""
+    global _asset_cache
+    with _asset_cache_lock:
+        if _asset_cache is None:
+            _asset_cache = AssetCache()
+        return _asset_cache
+
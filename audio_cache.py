@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Pre-encoded background audio tracks for video rendering
+
+Each track is decoded and encoded to AAC once, keyed by path + mtime, and the
+resulting stream is muxed into new renders with a stream copy instead of being
+re-encoded for every video.
+"""
+
+import hashlib
+import os
+import subprocess
+import threading
+import uuid
+from typing import Dict, Tuple
+
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from config import AUDIO_CACHE_DIR, AUDIO_BITRATE
+
+
+class AudioTrackCache:
+    """Process-wide cache of AAC-encoded audio tracks, shared between processes on disk"""
+
+    def __init__(self, cache_dir: str = AUDIO_CACHE_DIR, bitrate: str = AUDIO_BITRATE):
+        self.cache_dir = cache_dir
+        self.bitrate = bitrate
+        self._lock = threading.Lock()
+        self._tracks: Dict[Tuple[str, int, int], Tuple[str, float]] = {}
+
+    def _cache_path(self, key: Tuple[str, int, int]) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.m4a")
+
+    def _encode(self, audio_path: str, cache_path: str) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Encode to a private file first so concurrent renders never see a partial track
+        partial_path = f"{cache_path}.{uuid.uuid4().hex[:8]}.part"
+        command = [
+            FFMPEG_BINARY, "-y", "-loglevel", "error",
+            "-i", audio_path,
+            "-vn", "-c:a", "aac", "-b:a", self.bitrate,
+            "-f", "mp4", partial_path
+        ]
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+            raise Exception(f"Audio encode failed: {result.stderr.decode(errors='replace').strip()}")
+        os.replace(partial_path, cache_path)
+
+    def get(self, audio_path: str) -> Tuple[str, float]:
+        """
+        Return (aac_path, duration) for audio_path, encoding it on first use
+
+        A changed source file (new mtime or size) gets a fresh cache entry.
+        """
+        stat = os.stat(audio_path)
+        key = (os.path.abspath(audio_path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            track = self._tracks.get(key)
+            if track and os.path.exists(track[0]):
+                return track
+
+            cache_path = self._cache_path(key)
+            if not os.path.exists(cache_path):
+                print(f"🎵 Encoding audio track once: {audio_path}")
+                self._encode(audio_path, cache_path)
+
+            track = (cache_path, ffmpeg_parse_infos(cache_path)["duration"])
+            self._tracks[key] = track
+            return track
+
+
+# Global audio track cache (one per process; the encoded files are shared on disk)
+audio_cache = AudioTrackCache()
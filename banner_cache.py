@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Rendered title banner cache
+
+Titles repeat constantly (they follow TITLE_PATTERNS), so banners are rendered
+once per (text, size, colors, font) and kept as numpy frames in an in-memory
+LRU, backed by PNGs on disk that survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable
+
+import numpy as np
+from PIL import Image
+
+from config import BANNER_CACHE_DIR, BANNER_CACHE_MEMORY_ENTRIES, BANNER_CACHE_DISK_ENTRIES
+
+
+def banner_key(**template: Any) -> str:
+    """Hash of the banner text and every template setting that affects its pixels"""
+    return hashlib.sha256(json.dumps(template, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class BannerCache:
+    """In-memory LRU of banner frames with an on-disk PNG second level"""
+
+    def __init__(self, cache_dir: str = BANNER_CACHE_DIR, memory_entries: int = BANNER_CACHE_MEMORY_ENTRIES,
+                 disk_entries: int = BANNER_CACHE_DISK_ENTRIES):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._lock = threading.Lock()
+        self._frames: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _remember(self, key: str, frame: np.ndarray) -> None:
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.memory_entries:
+                self._frames.popitem(last=False)
+
+    def _load_from_disk(self, key: str):
+        path = self._disk_path(key)
+        try:
+            with Image.open(path) as image:
+                frame = np.array(image.convert("RGB"))
+            os.utime(path)  # mark as recently used for disk eviction
+            return frame
+        except OSError:
+            return None
+
+    def _save_to_disk(self, key: str, frame: np.ndarray) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_path(key)
+        # Write to a private file first so concurrent readers never see a partial PNG
+        partial_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        Image.fromarray(frame).save(partial_path, format="PNG")
+        os.replace(partial_path, path)
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".png")]
+        if len(entries) <= self.disk_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.disk_entries]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def get_or_render(self, key: str, render: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return the cached frame for key, rendering (and caching) it on a miss"""
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return frame
+
+        frame = self._load_from_disk(key)
+        if frame is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            frame = np.ascontiguousarray(render(), dtype=np.uint8)
+            self._save_to_disk(key, frame)
+
+        # Shared between renders: never modified in place
+        frame.setflags(write=False)
+        self._remember(key, frame)
+        return frame
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_entries": len(self._frames),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+
+# Global banner cache
+banner_cache = BannerCache()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Concurrent fan-out pipeline producing many finished posts (quote + image + video)
+
+Every item flows through the LLM, image, render and upload stages independently,
+so different items occupy different stages at the same time. Each stage has its
+own concurrency limit: the LLM is cheap to fan out, the image API is rate-limited
+and rendering is CPU-bound.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from config import (
+    PIPELINE_LLM_CONCURRENCY, PIPELINE_IMAGE_CONCURRENCY, PIPELINE_IMAGE_RATE_PER_MINUTE,
+    PIPELINE_RENDER_CONCURRENCY, PIPELINE_UPLOAD_CONCURRENCY
+)
+from models import BatchPostSpec, QuoteResponse
+from quote_generator import ViralQuoteGenerator
+
+
+class RateLimiter:
+    """Space out calls so that at most `rate_per_minute` start in any minute"""
+
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class BatchPipeline:
+    """Runs batch post specs through per-stage concurrency limits, yielding items as they finish"""
+
+    def __init__(self, generator: ViralQuoteGenerator,
+                 llm_concurrency: int = PIPELINE_LLM_CONCURRENCY,
+                 image_concurrency: int = PIPELINE_IMAGE_CONCURRENCY,
+                 image_rate_per_minute: float = PIPELINE_IMAGE_RATE_PER_MINUTE,
+                 render_concurrency: int = PIPELINE_RENDER_CONCURRENCY,
+                 upload_concurrency: int = PIPELINE_UPLOAD_CONCURRENCY):
+        self.generator = generator
+        # Limits are shared by all batches running in this process
+        self._llm = asyncio.Semaphore(llm_concurrency)
+        self._image = asyncio.Semaphore(image_concurrency)
+        self._image_rate = RateLimiter(image_rate_per_minute)
+        self._render = asyncio.Semaphore(render_concurrency)
+        self._upload = asyncio.Semaphore(upload_concurrency)
+
+    async def _run_item(self, index: int, spec: BatchPostSpec) -> Dict[str, Any]:
+        """Run one spec through every stage it needs; failures are reported per item"""
+        stage = "quote"
+        image_url = image_filename = video_url = video_filename = None
+
+        try:
+            async with self._llm:
+                quote = await self.generator.agenerate_quote(
+                    spec.theme, spec.target_audience, spec.format_preference
+                )
+            if quote.error:
+                raise Exception(quote.error)
+
+            if spec.image or spec.video:
+                stage = "image"
+                async with self._image:
+                    await self._image_rate.acquire()
+                    (image_filename, image_url,
+                     image_bytes) = await self.generator.image_generator.agenerate_quote_image_with_bytes(
+                        quote.content, spec.image_style, spec.force
+                    )
+                await self.generator.asave_media(quote, image_url=image_url)
+
+            if spec.video:
+                stage = "render"
+
+                def track_video_stage(video_stage: str, fraction: float) -> None:
+                    nonlocal stage
+                    if video_stage == "video_upload":
+                        stage = "upload"
+
+                video_filename, video_url = await self.generator.video_generator.generate_quote_video(
+                    image_url, quote.title,
+                    progress=track_video_stage,
+                    image_bytes=image_bytes,
+                    force=spec.force,
+                    render_limit=self._render,
+                    upload_limit=self._upload
+                )
+                await self.generator.asave_media(quote, video_url=video_url)
+
+            return {
+                "index": index,
+                "success": True,
+                "quote": QuoteResponse(
+                    id=quote.id,
+                    title=quote.title,
+                    content=quote.content,
+                    theme=quote.theme,
+                    target_audience=quote.target_audience,
+                    created_at=quote.created_at,
+                    caption=quote.caption,
+                    image_url=image_url,
+                    image_filename=image_filename,
+                    video_url=video_url,
+                    video_filename=video_filename
+                ).model_dump()
+            }
+
+        except Exception as e:
+            print(f"❌ Batch item {index} failed at {stage}: {str(e)}")
+            return {
+                "index": index,
+                "success": False,
+                "stage": stage,
+                "error": str(e)
+            }
+
+    async def run(self, specs: List[BatchPostSpec]) -> AsyncIterator[Dict[str, Any]]:
+        """Start every item and yield each result as soon as it completes"""
+        tasks = [asyncio.create_task(self._run_item(index, spec)) for index, spec in enumerate(specs)]
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away or the caller stopped iterating: drop the remaining work
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark blob uploads: SDK defaults vs the shared tuned uploader
+
+Uploads random payloads of 1-50 MB to AZURE_CONTAINER_NAME under a scratch
+folder, once with a default-configured client (the previous upload path) and
+once each through blob_uploader's blocking and async paths, then deletes them.
+
+Usage: python bench_blob_upload.py [sizes in MB...]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+from azure.storage.blob import BlobServiceClient
+
+from config import AZURE_STORAGE_CONNECTION_STRING, AZURE_CONTAINER_NAME
+from blob_upload import get_blob_uploader
+from http_clients import AZURE_AIO_AVAILABLE, aclose, get_blob_service_client
+
+BENCH_FOLDER = "upload-bench"
+DEFAULT_SIZES_MB = [1, 5, 10, 25, 50]
+
+
+def _report(label: str, size: int, seconds: float) -> None:
+    print(f"  {label:<22} {seconds:6.2f}s  {size / seconds / 1024 ** 2:7.1f} MB/s")
+
+
+async def main(sizes_mb):
+    default_client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
+    container = get_blob_service_client().get_container_client(AZURE_CONTAINER_NAME)
+    print(f"🧪 Blob upload benchmark (async client: {'aiohttp' if AZURE_AIO_AVAILABLE else 'thread fallback'})")
+
+    uploaded = []
+    try:
+        for size_mb in sizes_mb:
+            size = int(size_mb * 1024 ** 2)
+            data = os.urandom(size)
+            print(f"\n📦 {size_mb} MB")
+
+            blob_path = f"{BENCH_FOLDER}/{uuid.uuid4().hex}.mp4"
+            uploaded.append(blob_path)
+            start = time.perf_counter()
+            default_client.get_blob_client(AZURE_CONTAINER_NAME, blob_path).upload_blob(data, overwrite=True)
+            _report("SDK defaults", size, time.perf_counter() - start)
+
+            blob_path = f"{BENCH_FOLDER}/{uuid.uuid4().hex}.mp4"
+            uploaded.append(blob_path)
+            start = time.perf_counter()
+            get_blob_uploader().upload(blob_path, data, "video/mp4")
+            _report("blob_uploader.upload", size, time.perf_counter() - start)
+
+            blob_path = f"{BENCH_FOLDER}/{uuid.uuid4().hex}.mp4"
+            uploaded.append(blob_path)
+            start = time.perf_counter()
+            await get_blob_uploader().aupload(blob_path, data, "video/mp4")
+            _report("blob_uploader.aupload", size, time.perf_counter() - start)
+    finally:
+        for blob_path in uploaded:
+            try:
+                container.delete_blob(blob_path)
+            except Exception as e:
+                print(f"⚠️ Could not delete {blob_path}: {e}")
+        await aclose()
+
+
+if __name__ == "__main__":
+    sizes = [float(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES_MB
+    asyncio.run(main(sizes))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the near-duplicate index: signature time, lookup latency and
+candidate counts as the number of stored quotes grows, plus recall on
+lightly edited copies of stored quotes.
+
+Usage: python bench_dedup_index.py [stored quote counts...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from dedup_index import QuoteDedupIndex
+
+DEFAULT_SIZES = [20_000, 100_000, 1_000_000]
+LOOKUPS = 500
+
+_WORDS = (
+    "you your they them people energy peace love heart mind soul time life growth healing boundaries "
+    "silence trust respect loyalty effort value worth self care protect choose stop start keep let go "
+    "become real quiet loud soft strong alone together never always sometimes finally still when if "
+    "because until before after the a is are was be not no more less who what why how everything nothing"
+).split()
+
+
+def synthetic_quote(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(12, 24))).capitalize() + "."
+
+
+def edited_copy(quote: str, rng: random.Random) -> str:
+    words = quote.rstrip(".").split()
+    words[rng.randrange(len(words))] = rng.choice(_WORDS)
+    return " ".join(words) + "!"
+
+
+def fill(index: QuoteDedupIndex, quotes) -> None:
+    """Bulk insert without the per-quote duplicate check"""
+    rows, buckets = [], []
+    start_id = index.count() + 1
+    for offset, quote in enumerate(quotes):
+        signature = index._signature(quote)
+        rows.append((start_id + offset, quote, signature.tobytes()))
+        buckets.extend((band, bucket, start_id + offset) for band, bucket in index._band_buckets(signature))
+    index._conn.executemany("INSERT INTO dedup_quotes (id, content, signature) VALUES (?, ?, ?)", rows)
+    index._conn.executemany("INSERT INTO dedup_buckets (band, bucket, quote_id) VALUES (?, ?, ?)", buckets)
+    index._conn.commit()
+
+
+def candidate_count(index: QuoteDedupIndex, quote: str) -> int:
+    buckets = index._band_buckets(index._signature(quote))
+    clause = " OR ".join("(band = ? AND bucket = ?)" for _ in buckets)
+    params = [value for bucket in buckets for value in bucket]
+    return index._conn.execute(
+        f"SELECT COUNT(DISTINCT quote_id) FROM dedup_buckets WHERE {clause}", params
+    ).fetchone()[0]
+
+
+def main(sizes):
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = QuoteDedupIndex(db_path=os.path.join(tmp, "dedup.db"))
+        print(f"🧪 Dedup index benchmark: {index.bands} bands x {index.rows_per_band} rows, "
+              f"threshold {index.threshold}")
+
+        probe = synthetic_quote(rng)
+        start = time.perf_counter()
+        for _ in range(LOOKUPS):
+            index._signature(probe)
+        print(f"  signature: {(time.perf_counter() - start) / LOOKUPS * 1000:.3f} ms")
+
+        stored = []
+        for size in sorted(sizes):
+            batch = [synthetic_quote(rng) for _ in range(size - len(stored))]
+            fill(index, batch)
+            stored.extend(batch)
+
+            fresh = [synthetic_quote(rng) for _ in range(LOOKUPS)]
+            timings = []
+            for quote in fresh:
+                start = time.perf_counter()
+                index.find_duplicate(quote)
+                timings.append((time.perf_counter() - start) * 1000)
+            candidates = [candidate_count(index, quote) for quote in fresh[:100]]
+            edits = [edited_copy(rng.choice(stored), rng) for _ in range(200)]
+            recall = sum(index.find_duplicate(quote) is not None for quote in edits) / len(edits)
+
+            print(f"\n📦 {size:,} quotes")
+            print(f"  lookup p50 {np.percentile(timings, 50):.3f} ms  p99 {np.percentile(timings, 99):.3f} ms")
+            print(f"  candidates per lookup (mean): {np.mean(candidates):.1f}")
+            print(f"  recall on one-word edits: {recall:.1%}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Azure Blob uploads
+
+BlobUploader is the single place blobs are written from: every upload gets a
+content type and cache headers (so CDNs and the Instagram Graph API can fetch
+the URL directly), an optional Content-MD5, and is split into parallel blocks
+once it exceeds BLOB_MAX_SINGLE_PUT_SIZE. Async uploads use the aio client
+when aiohttp is installed and a worker thread otherwise.
+
+Data produced incrementally (e.g. an encoder's stdout) goes through
+BlockBlobStream instead: it is cut into blocks that are staged in parallel
+while more data is still being produced, and the block list is committed once
+the stream ends. Nothing has to be buffered beyond the blocks in flight, and
+the upload finishes shortly after the last byte is written.
+"""
+
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Dict, List, Optional, Union
+
+from azure.storage.blob import BlobBlock, BlobClient, ContentSettings
+
+from config import (
+    AZURE_CONTAINER_NAME, BLOB_STREAM_BLOCK_SIZE, BLOB_STREAM_CONCURRENCY, BLOB_UPLOAD_CONCURRENCY,
+    BLOB_VALIDATE_CONTENT, BLOB_STORE_CONTENT_MD5, BLOB_CACHE_CONTROL
+)
+from http_clients import get_blob_service_client, get_async_blob_service_client
+
+
+def content_settings(content_type: str, content_md5: Optional[bytes] = None) -> ContentSettings:
+    """Blob properties served with every download"""
+    return ContentSettings(
+        content_type=content_type,
+        cache_control=BLOB_CACHE_CONTROL or None,
+        content_md5=bytearray(content_md5) if content_md5 is not None else None
+    )
+
+
+class BlobUploader:
+    """Uploads to one container with the configured transfer settings"""
+
+    def __init__(self, container_name: str = AZURE_CONTAINER_NAME, max_concurrency: int = BLOB_UPLOAD_CONCURRENCY,
+                 validate_content: bool = BLOB_VALIDATE_CONTENT, store_content_md5: bool = BLOB_STORE_CONTENT_MD5):
+        self.container_name = container_name
+        self.max_concurrency = max(1, max_concurrency)
+        self.validate_content = validate_content
+        self.store_content_md5 = store_content_md5
+
+    def url(self, blob_path: str) -> str:
+        account_name = get_blob_service_client().account_name
+        return f"https://{account_name}.blob.core.windows.net/{self.container_name}/{blob_path}"
+
+    def _options(self, data: Union[bytes, IO[bytes]], content_type: str, length: Optional[int]) -> Dict[str, Any]:
+        # Content-MD5 is only computed for in-memory data; files would have to be read twice
+        content_md5 = None
+        if self.store_content_md5 and isinstance(data, (bytes, bytearray)):
+            content_md5 = hashlib.md5(data).digest()
+        return {
+            "length": length,
+            "overwrite": True,
+            "max_concurrency": self.max_concurrency,
+            "validate_content": self.validate_content,
+            "content_settings": content_settings(content_type, content_md5)
+        }
+
+    def upload(self, blob_path: str, data: Union[bytes, IO[bytes]], content_type: str,
+               length: Optional[int] = None) -> str:
+        """Upload bytes or a binary file object and return the blob URL"""
+        blob_client = get_blob_service_client().get_blob_client(self.container_name, blob_path)
+        blob_client.upload_blob(data, **self._options(data, content_type, length))
+        return self.url(blob_path)
+
+    async def aupload(self, blob_path: str, data: Union[bytes, IO[bytes]], content_type: str,
+                      length: Optional[int] = None) -> str:
+        """Async upload; falls back to the blocking client on a worker thread without aiohttp"""
+        service_client = get_async_blob_service_client()
+        if service_client is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.upload, blob_path, data, content_type, length)
+        blob_client = service_client.get_blob_client(self.container_name, blob_path)
+        await blob_client.upload_blob(data, **self._options(data, content_type, length))
+        return self.url(blob_path)
+
+
+class BlockBlobStream:
+    """File-like writer that stages fixed-size blocks in parallel and commits them on close"""
+
+    def __init__(self, blob_client: BlobClient, content_type: str, block_size: int = BLOB_STREAM_BLOCK_SIZE,
+                 max_concurrency: int = BLOB_STREAM_CONCURRENCY, validate_content: bool = BLOB_VALIDATE_CONTENT,
+                 store_content_md5: bool = BLOB_STORE_CONTENT_MD5):
+        self.blob_client = blob_client
+        self.content_type = content_type
+        self.block_size = block_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.validate_content = validate_content
+        self.size = 0
+        self._md5 = hashlib.md5() if store_content_md5 else None
+        self._buffer = bytearray()
+        self._block_ids: List[str] = []
+        self._pending: List[Future] = []
+        # At most 2 * max_concurrency blocks held in memory; write() blocks beyond that
+        self._in_flight = threading.BoundedSemaphore(2 * self.max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+
+    def _stage(self, block_id: str, data: bytes) -> None:
+        try:
+            self.blob_client.stage_block(block_id, data, length=len(data), validate_content=self.validate_content)
+        finally:
+            self._in_flight.release()
+
+    def _submit(self, data: bytes) -> None:
+        # Block ids must all have the same length
+        block_id = f"{len(self._block_ids):08d}"
+        self._block_ids.append(block_id)
+        self._in_flight.acquire()
+        self._pending.append(self._executor.submit(self._stage, block_id, data))
+
+    def _raise_failed(self) -> None:
+        for future in self._pending:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def write(self, data: bytes) -> int:
+        self._raise_failed()
+        self._buffer += data
+        self.size += len(data)
+        if self._md5 is not None:
+            self._md5.update(data)
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[:self.block_size]))
+            del self._buffer[:self.block_size]
+        return len(data)
+
+    def commit(self) -> None:
+        """Stage the remaining data, wait for every block and commit the block list"""
+        try:
+            if self._buffer or not self._block_ids:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            for future in self._pending:
+                future.result()
+            self.blob_client.commit_block_list(
+                [BlobBlock(block_id) for block_id in self._block_ids],
+                content_settings=content_settings(
+                    self.content_type, self._md5.digest() if self._md5 is not None else None
+                )
+            )
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def abort(self) -> None:
+        """Stop staging; blocks that were never committed are discarded by the service"""
+        self._buffer.clear()
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+_blob_uploader: Optional[BlobUploader] = None
+_blob_uploader_lock = threading.Lock()
+
+
+def get_blob_uploader() -> BlobUploader:
+    """Shared uploader for the configured container"""
+    global _blob_uploader
+    with _blob_uploader_lock:
+        if _blob_uploader is None:
+            _blob_uploader = BlobUploader()
+        return _blob_uploader
+
@@ -4,6 +4,7 @@ Configuration and constants for the Gen Z Quote Generator
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,23 +15,98 @@ OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://litellm.tecosys.ai/")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MODEL_NAME = "gpt-4.1-mini"
 TEMPERATURE = 0.8
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() in ("1", "true", "yes")  # response_format=json_object
+LLM_JSON_MAX_RETRIES = int(os.getenv("LLM_JSON_MAX_RETRIES", "2"))  # re-asks after a malformed response
+LLM_METRICS_RECENT_CALLS = int(os.getenv("LLM_METRICS_RECENT_CALLS", "20"))  # per-call prompt cache stats kept
 
 ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")
 INSTAGRAM_USER_ID = "17841475846754872"
 BASE_URL = "https://graph.instagram.com/v23.0"
 
+# Local persistence (job queue, caches, quote store)
+DATA_DIR = os.getenv("DATA_DIR", "data")
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(DATA_DIR, "jobs.db"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+QUOTES_DB_PATH = os.getenv("QUOTES_DB_PATH", os.path.join(DATA_DIR, "quotes.db"))
+
+# Trending rankings and engagement refresh from Instagram insights
+TRENDING_INDEX_SIZE = int(os.getenv("TRENDING_INDEX_SIZE", "500"))  # quotes kept per ranking
+INSTAGRAM_INSIGHT_METRICS = ["likes", "comments", "shares", "saved", "reach"]
+ENGAGEMENT_REFRESH_INTERVAL = float(os.getenv("ENGAGEMENT_REFRESH_INTERVAL", "3600"))  # seconds, 0 = off
+ENGAGEMENT_REFRESH_BATCH = int(os.getenv("ENGAGEMENT_REFRESH_BATCH", "50"))  # reels refreshed per pass
+ENGAGEMENT_REFRESH_MAX_AGE_DAYS = int(os.getenv("ENGAGEMENT_REFRESH_MAX_AGE_DAYS", "30"))
+
+# Near-duplicate detection for generated quotes (MinHash/LSH)
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+DEDUP_DB_PATH = os.getenv("DEDUP_DB_PATH", os.path.join(DATA_DIR, "dedup.db"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.6"))  # estimated Jaccard similarity
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))  # MinHash permutations
+# LSH banding; 0 = derive bands/rows from DEDUP_THRESHOLD and DEDUP_NUM_PERM
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "0"))
+DEDUP_ROWS_PER_BAND = int(os.getenv("DEDUP_ROWS_PER_BAND", "0"))
+# Weight of missed duplicates vs extra candidates when deriving the banding
+DEDUP_FALSE_NEGATIVE_WEIGHT = float(os.getenv("DEDUP_FALSE_NEGATIVE_WEIGHT", "0.7"))
+DEDUP_MAX_RETRIES = int(os.getenv("DEDUP_MAX_RETRIES", "3"))  # regenerations before accepting a duplicate
+
+# Deterministic generation (temperature 0 + fixed seed) and its persistent response cache
+LLM_DETERMINISTIC_SEED = int(os.getenv("LLM_DETERMINISTIC_SEED", "42"))
+LLM_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH", os.path.join(DATA_DIR, "llm_cache.db"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 86400)))  # seconds, 0 = never expire
+
+# Shared outbound HTTP clients (keep-alive pools per host)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # hosts kept in the pool
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))  # connections kept per host
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Batch quote generation (several quotes per LLM call)
+BATCH_MAX_QUOTES = int(os.getenv("BATCH_MAX_QUOTES", "200"))  # per request
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "10"))  # quotes asked for in one LLM call
+BATCH_MAX_ROUNDS = int(os.getenv("BATCH_MAX_ROUNDS", "3"))  # top-up rounds when the model returns too few
+
+# Warm pool of pre-generated quotes per (theme, audience), refilled in the background
+QUOTE_POOL_ENABLED = os.getenv("QUOTE_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+QUOTE_POOL_LOW_WATERMARK = int(os.getenv("QUOTE_POOL_LOW_WATERMARK", "3"))  # refill below this many
+QUOTE_POOL_HIGH_WATERMARK = int(os.getenv("QUOTE_POOL_HIGH_WATERMARK", "10"))  # refill up to this many
+QUOTE_POOL_TTL = float(os.getenv("QUOTE_POOL_TTL", "86400"))  # seconds before a pooled quote is discarded
+QUOTE_POOL_WARM_THEMES = [t for t in os.getenv("QUOTE_POOL_WARM_THEMES", "mixed").split(",") if t]
+QUOTE_POOL_WARM_AUDIENCES = [a for a in os.getenv("QUOTE_POOL_WARM_AUDIENCES", "gen-z").split(",") if a]
+QUOTE_POOL_MAX_POOLS = int(os.getenv("QUOTE_POOL_MAX_POOLS", "32"))  # on-demand pools beyond this evict the least recently used
+
+# Instagram container polling (adaptive backoff, seconds)
+CONTAINER_POLL_INITIAL_DELAY = float(os.getenv("CONTAINER_POLL_INITIAL_DELAY", "5"))
+CONTAINER_POLL_MAX_DELAY = float(os.getenv("CONTAINER_POLL_MAX_DELAY", "60"))
+CONTAINER_POLL_BACKOFF = float(os.getenv("CONTAINER_POLL_BACKOFF", "2"))
+
 # Azure OpenAI Image Generation Configuration
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "https://hara-md2td469-westus3.cognitiveservices.azure.com/")
 AZURE_DEPLOYMENT_NAME = os.getenv("DEPLOYMENT_NAME", "gpt-image-1")
 AZURE_API_VERSION = os.getenv("OPENAI_API_VERSION", "2025-04-01-preview")
 AZURE_SUBSCRIPTION_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 
+# Generated images are uploaded as returned by the API (JPEG) unless a transcode policy is set
+IMAGE_TRANSCODE_FORMAT = os.getenv("IMAGE_TRANSCODE_FORMAT", "").upper() or None  # e.g. JPEG, WEBP, AVIF
+IMAGE_TRANSCODE_QUALITY = int(os.getenv("IMAGE_TRANSCODE_QUALITY", "90"))
+IMAGE_MAX_SIZE = int(os.getenv("IMAGE_MAX_SIZE", "0"))  # longest side in pixels, 0 = keep original
+
 # Azure Blob Storage Configuration
 AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 AZURE_CONTAINER_NAME = os.getenv("AZURE_CONTAINER_NAME")
 AZURE_BLOB_FOLDER = os.getenv("AZURE_BLOB_FOLDER", "image-gen")
 AZURE_VIDEO_FOLDER = os.getenv("AZURE_VIDEO_FOLDER", "video-gen")
 
+# Blob upload tuning: blobs above the single-put size go up as parallel blocks
+BLOB_UPLOAD_CONCURRENCY = int(os.getenv("BLOB_UPLOAD_CONCURRENCY", "4"))  # blocks in flight per upload
+BLOB_MAX_BLOCK_SIZE = int(os.getenv("BLOB_MAX_BLOCK_SIZE", str(4 * 1024 * 1024)))
+BLOB_MAX_SINGLE_PUT_SIZE = int(os.getenv("BLOB_MAX_SINGLE_PUT_SIZE", str(8 * 1024 * 1024)))
+BLOB_VALIDATE_CONTENT = os.getenv("BLOB_VALIDATE_CONTENT", "false").lower() in ("1", "true", "yes")  # per-request MD5
+BLOB_STORE_CONTENT_MD5 = os.getenv("BLOB_STORE_CONTENT_MD5", "true").lower() in ("1", "true", "yes")  # Content-MD5 property
+# Blob names are unique per render, so CDNs may cache them indefinitely
+BLOB_CACHE_CONTROL = os.getenv("BLOB_CACHE_CONTROL", "public, max-age=31536000, immutable")
+
 # Video Generation Configuration
 DEFAULT_AUDIO_FILE = os.getenv("DEFAULT_AUDIO_FILE", "new.mp3")
 VIDEO_SIZE = (1080, 1920)  # Portrait mode for social media
@@ -48,6 +124,56 @@ MARGIN = 40
 LINE_SPACING = 10
 WIDTH = 1024
 HEIGHT = 250
+
+# Video render process pool (one render per core, with bounded queueing)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", str(2 * RENDER_WORKERS)))
+RENDER_QUEUE_TIMEOUT = float(os.getenv("RENDER_QUEUE_TIMEOUT", "600"))  # seconds to wait for a slot
+RENDER_FFMPEG_THREADS = int(os.getenv("RENDER_FFMPEG_THREADS", "1"))  # encoder threads per render
+RENDER_MP_START_METHOD = os.getenv("RENDER_MP_START_METHOD", "spawn")
+
+# Batch post pipeline (quote -> image -> render -> upload, per-stage concurrency)
+PIPELINE_MAX_ITEMS = int(os.getenv("PIPELINE_MAX_ITEMS", "100"))  # per request
+PIPELINE_LLM_CONCURRENCY = int(os.getenv("PIPELINE_LLM_CONCURRENCY", "16"))
+PIPELINE_IMAGE_CONCURRENCY = int(os.getenv("PIPELINE_IMAGE_CONCURRENCY", "4"))
+PIPELINE_IMAGE_RATE_PER_MINUTE = float(os.getenv("PIPELINE_IMAGE_RATE_PER_MINUTE", "20"))  # 0 = unlimited
+PIPELINE_RENDER_CONCURRENCY = int(os.getenv("PIPELINE_RENDER_CONCURRENCY", str(RENDER_WORKERS)))
+PIPELINE_UPLOAD_CONCURRENCY = int(os.getenv("PIPELINE_UPLOAD_CONCURRENCY", "8"))
+
+# Static-template fast path: precomposed frames + ffmpeg filtergraph instead of per-frame MoviePy compositing
+VIDEO_FAST_RENDER = os.getenv("VIDEO_FAST_RENDER", "true").lower() in ("1", "true", "yes")
+VIDEO_X264_PRESET = os.getenv("VIDEO_X264_PRESET", "medium")
+
+# Encoded videos stay in memory up to this size, otherwise they are kept as a scratch file.
+# Point VIDEO_SCRATCH_DIR at /dev/shm to keep scratch files in tmpfs, but only if it is big
+# enough for every concurrent render (Docker gives containers 64 MB unless run with --shm-size)
+VIDEO_MEMORY_LIMIT = int(os.getenv("VIDEO_MEMORY_LIMIT", str(64 * 1024 * 1024)))
+VIDEO_SCRATCH_DIR = os.getenv("VIDEO_SCRATCH_DIR") or tempfile.gettempdir()
+VIDEO_PIPE_CHUNK_SIZE = int(os.getenv("VIDEO_PIPE_CHUNK_SIZE", str(1024 * 1024)))
+
+# Fast-path videos are uploaded block by block while ffmpeg is still encoding them.
+# Streamed blobs are fragmented MP4 (no seekable output to move the moov atom up front),
+# so this stays opt-in until Reels ingestion of fragmented files has been verified
+VIDEO_STREAM_UPLOAD = os.getenv("VIDEO_STREAM_UPLOAD", "false").lower() in ("1", "true", "yes")
+VIDEO_FRAGMENT_DURATION = float(os.getenv("VIDEO_FRAGMENT_DURATION", "1"))  # seconds per MP4 fragment
+BLOB_STREAM_BLOCK_SIZE = int(os.getenv("BLOB_STREAM_BLOCK_SIZE", str(1024 * 1024)))
+BLOB_STREAM_CONCURRENCY = int(os.getenv("BLOB_STREAM_CONCURRENCY", "4"))
+
+# Background audio tracks are AAC-encoded once and stream-copied into every render
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", os.path.join(DATA_DIR, "audio_cache"))
+AUDIO_BITRATE = os.getenv("AUDIO_BITRATE", "192k")
+
+# Rendered title banners (numpy frames in memory, PNGs on disk)
+BANNER_CACHE_DIR = os.getenv("BANNER_CACHE_DIR", os.path.join(DATA_DIR, "banner_cache"))
+BANNER_CACHE_MEMORY_ENTRIES = int(os.getenv("BANNER_CACHE_MEMORY_ENTRIES", "256"))
+BANNER_CACHE_DISK_ENTRIES = int(os.getenv("BANNER_CACHE_DISK_ENTRIES", "5000"))
+
+# Content-addressed cache of uploaded images/videos (hash of inputs -> blob URL)
+ASSET_CACHE_ENABLED = os.getenv("ASSET_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+ASSET_CACHE_DB_PATH = os.getenv("ASSET_CACHE_DB_PATH", os.path.join(DATA_DIR, "assets.db"))
+ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", os.path.join(DATA_DIR, "asset_cache"))  # local image copies
+ASSET_CACHE_MAX_BYTES = int(os.getenv("ASSET_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))  # bytes of local copies
+
 # Caption Generation Configuration
 CAPTION_TEMPLATES = [
     "Follow to get such interesting content 🔥",
@@ -350,3 +476,24 @@ Example: "At 18, she has choices. At 18, you have nothing."
 - Anything that sounds preachy or condescending
 
 Generate ONE quote that follows these proven viral patterns. Make it short, relatable, and instantly shareable."""
+
+# Fixed output rules, sent right after the system prompt so that prompt + rules form a
+# stable prefix the provider can cache; only the short per-request details vary
+QUOTE_OUTPUT_RULES = """## OUTPUT RULES
+- Respond with valid JSON only: {"title": "...", "content": "..."}
+- Make it 100% unique and original (never repeat previous content)
+- Use authentic language for the target audience given in the request
+- Ensure it's shareable and screenshot-worthy
+- Provide genuine wisdom and fresh insight
+- Keep content under 25 words
+- Make title exactly 3-4 words (catchy and memorable)
+- Ensure content complements the title perfectly"""
+
+BATCH_OUTPUT_RULES = """## BATCH OUTPUT RULES
+These override the single-quote instruction above: generate the number of quotes given in the request.
+- Respond with a valid JSON object only: {"quotes": [{"title": "...", "content": "..."}, ...]} with exactly the requested number of quotes
+- Every quote must be distinct from the others in both title and message
+- Use authentic language for the target audience given in the request
+- Keep each content under 25 words
+- Make each title exactly 3-4 words (catchy and memorable)
+- Ensure each content complements its title perfectly"""
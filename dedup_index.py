@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Persistent near-duplicate index over generated quote contents
+
+Quotes are reduced to MinHash signatures over character shingles and bucketed
+with LSH banding in SQLite. A lookup is one indexed read over the query's band
+buckets, one batched read of the candidates' signatures and a vectorized
+comparison. The banding is derived from the similarity threshold so that
+quotes well below it rarely share a bucket; candidate counts (and lookup time)
+still grow with the number of stored quotes, just with a small constant.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    DEDUP_DB_PATH, DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_ROWS_PER_BAND,
+    DEDUP_FALSE_NEGATIVE_WEIGHT
+)
+
+
+# Universal hashing (a * h + b) mod p over 32-bit shingle hashes: with a, b < 2**32
+# and p just above 2**32, every intermediate value fits in uint64
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_SHINGLE_SIZE = 5
+_SQL_BATCH = 500
+# Bumped whenever the signature scheme changes; stored signatures are rebuilt on mismatch
+_SCHEME_VERSION = 2
+
+
+def normalize_quote_text(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def optimal_banding(threshold: float, num_perm: int,
+                    false_negative_weight: float = DEDUP_FALSE_NEGATIVE_WEIGHT) -> Tuple[int, int]:
+    """
+    (bands, rows_per_band) minimizing the weighted area of false positives below
+    threshold and false negatives above it under the LSH S-curve 1 - (1 - s**r)**b
+    """
+    below = np.linspace(0.0, threshold, 201)
+    above = np.linspace(threshold, 1.0, 201)
+    best = None
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positives = np.trapezoid(1 - (1 - below ** rows) ** bands, below)
+        false_negatives = np.trapezoid((1 - above ** rows) ** bands, above)
+        error = (1 - false_negative_weight) * false_positives + false_negative_weight * false_negatives
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class QuoteDedupIndex:
+    """MinHash/LSH index answering "have we already generated something like this?" """
+
+    def __init__(self, db_path: str = DEDUP_DB_PATH, threshold: float = DEDUP_THRESHOLD,
+                 num_perm: int = DEDUP_NUM_PERM, bands: int = DEDUP_BANDS, rows_per_band: int = DEDUP_ROWS_PER_BAND):
+        self.db_path = db_path
+        self.threshold = threshold
+        if not (bands and rows_per_band):
+            bands, rows_per_band = optimal_banding(threshold, num_perm)
+        self.bands = bands
+        self.rows_per_band = rows_per_band
+        self.num_perm = bands * rows_per_band
+
+        # Fixed seed: signatures must stay comparable across restarts
+        rng = np.random.default_rng(1729)
+        self._a = rng.integers(1, 1 << 32, size=self.num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, 1 << 32, size=self.num_perm, dtype=np.uint64)[:, None]
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS dedup_quotes (
+                id INTEGER PRIMARY KEY,
+                content TEXT NOT NULL,
+                signature BLOB NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS dedup_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                quote_id INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS dedup_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Covering index: candidate lookups never touch the table rows
+        self._conn.execute("DROP INDEX IF EXISTS idx_dedup_buckets")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dedup_buckets_cover ON dedup_buckets (band, bucket, quote_id)"
+        )
+        self._conn.commit()
+        self._rebuild_if_stale()
+
+    def _rebuild_if_stale(self) -> None:
+        """Re-sign every stored quote when the signature scheme or banding changed"""
+        params = f"{_SCHEME_VERSION}:{self.bands}x{self.rows_per_band}"
+        row = self._conn.execute("SELECT value FROM dedup_meta WHERE key = 'params'").fetchone()
+        if row is not None and row[0] == params:
+            return
+
+        self._conn.execute("DELETE FROM dedup_buckets")
+        rows = self._conn.execute("SELECT id, content FROM dedup_quotes").fetchall()
+        for quote_id, content in rows:
+            signature = self._signature(content)
+            self._conn.execute(
+                "UPDATE dedup_quotes SET signature = ? WHERE id = ?", (signature.tobytes(), quote_id)
+            )
+            self._conn.executemany(
+                "INSERT INTO dedup_buckets (band, bucket, quote_id) VALUES (?, ?, ?)",
+                [(band, bucket, quote_id) for band, bucket in self._band_buckets(signature)]
+            )
+        self._conn.execute("INSERT OR REPLACE INTO dedup_meta (key, value) VALUES ('params', ?)", (params,))
+        self._conn.commit()
+
+    def _signature(self, text: str) -> np.ndarray:
+        normalized = normalize_quote_text(text)
+        if len(normalized) <= _SHINGLE_SIZE:
+            shingles = {normalized}
+        else:
+            shingles = {normalized[i:i + _SHINGLE_SIZE] for i in range(len(normalized) - _SHINGLE_SIZE + 1)}
+
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+                for shingle in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # (num_perm, shingles) permuted hashes, minimum per permutation
+        permuted = (self._a * hashes[None, :] + self._b) % _PRIME
+        return (permuted.min(axis=1) & _MAX_HASH).astype("<u4")
+
+    def _band_buckets(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        buckets = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows_per_band:(band + 1) * self.rows_per_band]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+            # SQLite integers are signed 64-bit
+            buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+        return buckets
+
+    def _find(self, signature: np.ndarray, buckets: List[Tuple[int, int]]) -> Optional[str]:
+        clause = " OR ".join("(band = ? AND bucket = ?)" for _ in buckets)
+        params = [value for bucket in buckets for value in bucket]
+        candidate_ids = [
+            row[0] for row in self._conn.execute(
+                f"SELECT DISTINCT quote_id FROM dedup_buckets WHERE {clause}", params
+            )
+        ]
+
+        for start in range(0, len(candidate_ids), _SQL_BATCH):
+            batch = candidate_ids[start:start + _SQL_BATCH]
+            rows = self._conn.execute(
+                f"SELECT content, signature FROM dedup_quotes WHERE id IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            stored = np.frombuffer(b"".join(row[1] for row in rows), dtype="<u4").reshape(len(rows), self.num_perm)
+            similarities = (stored == signature).mean(axis=1)
+            best = int(similarities.argmax())
+            if similarities[best] >= self.threshold:
+                return rows[best][0]
+        return None
+
+    def find_duplicate(self, text: str) -> Optional[str]:
+        """Return a stored quote that is a near-duplicate of text, if any"""
+        signature = self._signature(text)
+        with self._lock:
+            return self._find(signature, self._band_buckets(signature))
+
+    def add_if_new(self, text: str) -> bool:
+        """
+        Store text unless a near-duplicate is already indexed
+
+        Returns:
+            True if text was new and has been added, False if it is a duplicate
+        """
+        signature = self._signature(text)
+        buckets = self._band_buckets(signature)
+
+        with self._lock:
+            if self._find(signature, buckets) is not None:
+                return False
+
+            cursor = self._conn.execute(
+                "INSERT INTO dedup_quotes (content, signature) VALUES (?, ?)",
+                (text, signature.tobytes())
+            )
+            self._conn.executemany(
+                "INSERT INTO dedup_buckets (band, bucket, quote_id) VALUES (?, ?, ?)",
+                [(band, bucket, cursor.lastrowid) for band, bucket in buckets]
+            )
+            self._conn.commit()
+            return True
+
+    def count(self) -> int:
+        """Number of indexed quotes"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dedup_quotes").fetchone()[0]
+
+
+_dedup_index: Optional[QuoteDedupIndex] = None
+_dedup_index_lock = threading.Lock()
+
+
+def get_dedup_index() -> QuoteDedupIndex:
+    """Shared dedup index, opened (and rebuilt if stale) on first use"""
+    global _dedup_index
+    with _dedup_index_lock:
+        if _dedup_index is None:
+            _dedup_index = QuoteDedupIndex()
+        return _dedup_index
+
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Engagement tracking for published reels
+
+Links published Instagram media back to the quote it was rendered from and
+periodically pulls insights, updating stored counters and the trending index
+incrementally.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from config import ENGAGEMENT_REFRESH_INTERVAL, ENGAGEMENT_REFRESH_BATCH, ENGAGEMENT_REFRESH_MAX_AGE_DAYS
+from instaupload import InstagramReelsAPI
+from quote_store import QuoteStore
+from trending_index import TrendingIndex
+
+
+class EngagementTracker:
+    """Keeps quote engagement scores in sync with Instagram insights"""
+
+    def __init__(self, store: QuoteStore, index: TrendingIndex, api: InstagramReelsAPI,
+                 interval: float = ENGAGEMENT_REFRESH_INTERVAL):
+        self.store = store
+        self.index = index
+        self.api = api
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def record_published(self, video_url: str, media_id: str) -> Optional[int]:
+        """Remember which quote a published reel belongs to; returns the quote ID if known"""
+        quote = self.store.link_media(str(video_url), media_id)
+        return quote["id"] if quote else None
+
+    def apply(self, quote_id: int, likes: int = 0, comments: int = 0, shares: int = 0,
+              saves: int = 0, reach: int = 0) -> Optional[float]:
+        """Store new counters for a quote and reposition it in the rankings"""
+        updated = self.store.update_engagement(quote_id, likes, comments, shares, saves, reach)
+        if updated is None:
+            return None
+        theme, score = updated
+        self.index.update(quote_id, theme, score)
+        return score
+
+    async def refresh_quote(self, quote: Dict[str, Any]) -> Optional[float]:
+        """Pull insights for one published quote and apply them"""
+        metrics = await self.api.aget_media_insights(quote["media_id"])
+        return self.apply(
+            quote["id"],
+            likes=metrics.get("likes", 0),
+            comments=metrics.get("comments", 0),
+            shares=metrics.get("shares", 0),
+            saves=metrics.get("saved", 0),
+            reach=metrics.get("reach", 0)
+        )
+
+    async def refresh(self, limit: int = ENGAGEMENT_REFRESH_BATCH) -> List[int]:
+        """Refresh the least recently updated published quotes; returns the refreshed IDs"""
+        since = (datetime.now() - timedelta(days=ENGAGEMENT_REFRESH_MAX_AGE_DAYS)).isoformat()
+        refreshed = []
+        for quote in self.store.published(limit, since):
+            try:
+                await self.refresh_quote(quote)
+                refreshed.append(quote["id"])
+            except Exception as e:
+                print(f"⚠️ Insights refresh failed for quote {quote['id']}: {str(e)}")
+        return refreshed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # A failed round (e.g. the store is locked) must not stop future refreshes
+                print(f"⚠️ Engagement refresh failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start the periodic refresh loop (disabled when the interval is 0)"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
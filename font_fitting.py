@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Font fitting for title banners
+
+Finds the largest font size at which a title, word-wrapped to the banner width,
+fits the available height. Fonts are loaded once per size, glyph metrics are
+cached per font, line widths are accumulated word by word from cached glyph
+advances instead of re-measuring every prefix, and the size is found by binary
+search instead of stepping down one size at a time.
+"""
+
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from PIL import ImageDraw, ImageFont
+
+FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVu-Sans-Bold.ttf"
+]
+
+
+@lru_cache(maxsize=128)
+def load_font(size: int):
+    """Bold TrueType font at the given size (cached), falling back to Pillow's default font"""
+    for font_path in FONT_PATHS:
+        if os.path.exists(font_path):
+            try:
+                return ImageFont.truetype(font_path, size)
+            except OSError:
+                continue
+    return ImageFont.load_default(size)
+
+
+class GlyphMetrics:
+    """Per-glyph advance and vertical extent for one font, measured on first use"""
+
+    def __init__(self, font):
+        self.font = font
+        self._glyphs: Dict[str, Tuple[float, int, int]] = {}
+
+    def glyph(self, char: str) -> Tuple[float, int, int]:
+        """(advance, top, bottom) of a single character"""
+        metrics = self._glyphs.get(char)
+        if metrics is None:
+            advance = self.font.getlength(char)
+            if char.isspace():
+                metrics = (advance, 0, 0)
+            else:
+                _, top, _, bottom = self.font.getbbox(char)
+                metrics = (advance, top, bottom)
+            self._glyphs[char] = metrics
+        return metrics
+
+    def width(self, text: str) -> float:
+        return sum(self.glyph(char)[0] for char in text)
+
+    def height(self, text: str) -> int:
+        extents = [self.glyph(char) for char in text if not char.isspace()]
+        if not extents:
+            return 0
+        return max(bottom for _, _, bottom in extents) - min(top for _, top, _ in extents)
+
+
+@lru_cache(maxsize=128)
+def glyph_metrics(size: int) -> GlyphMetrics:
+    """Glyph metrics cache for the banner font at the given size"""
+    return GlyphMetrics(load_font(size))
+
+
+@dataclass
+class FittedText:
+    """Wrapped lines and their measurements at the chosen font size"""
+    font: object
+    size: int
+    lines: List[str]
+    line_widths: List[float] = field(default_factory=list)
+    line_heights: List[int] = field(default_factory=list)
+    line_spacing: int = 10
+
+    @property
+    def total_height(self) -> int:
+        return sum(self.line_heights) + (len(self.lines) - 1) * self.line_spacing
+
+
+def wrap_text(text: str, metrics: GlyphMetrics, max_line_width: float) -> Tuple[List[str], List[float]]:
+    """
+    Greedy word wrap; returns (lines, line_widths)
+
+    A single word wider than the line is kept on its own line.
+    """
+    space = metrics.glyph(" ")[0]
+    lines: List[str] = []
+    widths: List[float] = []
+    line: List[str] = []
+    line_width = 0.0
+
+    for word in text.split():
+        word_width = metrics.width(word)
+        candidate = line_width + space + word_width if line else word_width
+        if candidate <= max_line_width or not line:
+            line.append(word)
+            line_width = candidate
+        else:
+            lines.append(" ".join(line))
+            widths.append(line_width)
+            line, line_width = [word], word_width
+
+    if line:
+        lines.append(" ".join(line))
+        widths.append(line_width)
+    return lines, widths
+
+
+def layout_text(text: str, size: int, max_width: int, margin: int = 40, line_spacing: int = 10) -> FittedText:
+    """Wrap and measure text at one font size"""
+    metrics = glyph_metrics(size)
+    lines, widths = wrap_text(text, metrics, max_width - 2 * margin)
+    return FittedText(
+        font=metrics.font,
+        size=size,
+        lines=lines,
+        line_widths=widths,
+        line_heights=[metrics.height(line) for line in lines],
+        line_spacing=line_spacing
+    )
+
+
+def fit_text(text: str, max_width: int, max_height: int, min_size: int = 8, max_size: int = 100,
+             margin: int = 40, line_spacing: int = 10) -> FittedText:
+    """
+    Largest font size in [min_size, max_size] whose wrapped text fits inside the box
+
+    Text height grows with the font size, so the size is found by binary search.
+    Falls back to min_size when nothing fits.
+    """
+    available_width = max_width - 2 * margin
+    available_height = max_height - 2 * margin
+    best = None
+    low, high = min_size, max_size
+    while low <= high:
+        size = (low + high) // 2
+        fitted = layout_text(text, size, max_width, margin, line_spacing)
+        fits = fitted.total_height <= available_height and max(fitted.line_widths, default=0) <= available_width
+        if fits:
+            best = fitted
+            low = size + 1
+        else:
+            high = size - 1
+    return best or layout_text(text, min_size, max_width, margin, line_spacing)
+
+
+def draw_centered(draw: ImageDraw.ImageDraw, fitted: FittedText, width: int, height: int, fill) -> None:
+    """Draw the fitted lines centered horizontally and vertically in a width x height box"""
+    y = (height - fitted.total_height) // 2
+    for line, line_width, line_height in zip(fitted.lines, fitted.line_widths, fitted.line_heights):
+        x = int((width - line_width) // 2)
+        draw.text((x, y), line, fill=fill, font=fitted.font)
+        y += line_height + fitted.line_spacing
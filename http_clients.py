@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP clients for outbound APIs (Azure OpenAI, Azure Blob, Instagram Graph)
+
+Connections are kept alive and pooled per host instead of paying a TCP+TLS
+handshake on every call. HTTP/2 is used by the async client when the optional
+`h2` package is installed, and an async Azure Blob client is available when the
+optional `aiohttp` package (its transport) is installed.
+"""
+
+import threading
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobServiceClient
+
+from config import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY, HTTP2_ENABLED, AZURE_STORAGE_CONNECTION_STRING,
+    BLOB_MAX_BLOCK_SIZE, BLOB_MAX_SINGLE_PUT_SIZE
+)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import aiohttp  # noqa: F401
+    from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+    AZURE_AIO_AVAILABLE = True
+except ImportError:
+    AZURE_AIO_AVAILABLE = False
+
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_blob_service_client: Optional[BlobServiceClient] = None
+_async_blob_service_client = None
+
+
+def get_session() -> requests.Session:
+    """Shared requests session for blocking calls"""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared httpx client for async calls (HTTP/2 when available)"""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED and HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE,
+                max_keepalive_connections=HTTP_POOL_MAXSIZE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+    return _async_client
+
+
+def get_blob_service_client() -> BlobServiceClient:
+    """Shared Azure Blob client whose transport reuses the pooled requests session"""
+    global _blob_service_client
+    session = get_session()
+    with _lock:
+        if _blob_service_client is None:
+            _blob_service_client = BlobServiceClient.from_connection_string(
+                AZURE_STORAGE_CONNECTION_STRING,
+                transport=RequestsTransport(
+                    session=session,
+                    session_owner=False,
+                    connection_timeout=HTTP_CONNECT_TIMEOUT,
+                    read_timeout=HTTP_TIMEOUT
+                ),
+                max_block_size=BLOB_MAX_BLOCK_SIZE,
+                max_single_put_size=BLOB_MAX_SINGLE_PUT_SIZE
+            )
+        return _blob_service_client
+
+
+def get_async_blob_service_client():
+    """Shared async Azure Blob client, or None when aiohttp is not installed"""
+    global _async_blob_service_client
+    if not AZURE_AIO_AVAILABLE:
+        return None
+    if _async_blob_service_client is None:
+        _async_blob_service_client = AsyncBlobServiceClient.from_connection_string(
+            AZURE_STORAGE_CONNECTION_STRING,
+            connection_timeout=HTTP_CONNECT_TIMEOUT,
+            read_timeout=HTTP_TIMEOUT,
+            max_block_size=BLOB_MAX_BLOCK_SIZE,
+            max_single_put_size=BLOB_MAX_SINGLE_PUT_SIZE
+        )
+    return _async_blob_service_client
+
+
+async def aclose() -> None:
+    """Close pooled connections (called on application shutdown)"""
+    global _async_client, _async_blob_service_client, _session
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _async_blob_service_client is not None:
+        await _async_blob_service_client.close()
+        _async_blob_service_client = None
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
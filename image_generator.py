@@ -4,7 +4,7 @@ Image generation service using Azure OpenAI DALL-E with Azure Blob Storage
 """
 
 import os
-import requests
+import asyncio
 import base64
 import uuid
 from datetime import datetime
@@ -12,14 +12,18 @@ from PIL import Image
 from io import BytesIO
 from typing import Optional, Tuple
 
-from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
-
 from config import (
     AZURE_OPENAI_ENDPOINT, AZURE_DEPLOYMENT_NAME, 
     AZURE_API_VERSION, AZURE_SUBSCRIPTION_KEY,
     IMAGE_STYLE_TEMPLATES, AZURE_STORAGE_CONNECTION_STRING,
-    AZURE_CONTAINER_NAME, AZURE_BLOB_FOLDER
+    AZURE_CONTAINER_NAME, AZURE_BLOB_FOLDER,
+    IMAGE_TRANSCODE_FORMAT, IMAGE_TRANSCODE_QUALITY, IMAGE_MAX_SIZE
 )
+from http_clients import get_session, get_async_client, get_blob_service_client
+from asset_cache import asset_key, get_asset_cache
+from blob_upload import get_blob_uploader
+
+JPEG_MAGIC = b"\xff\xd8\xff"
 
 
 class QuoteImageGenerator:
@@ -36,8 +40,8 @@ class QuoteImageGenerator:
         self.container_name = AZURE_CONTAINER_NAME
         self.blob_folder = AZURE_BLOB_FOLDER
         
-        # Initialize blob service client
-        self.blob_service_client = BlobServiceClient.from_connection_string(self.connection_string)
+        # Shared blob service client (pooled connections)
+        self.blob_service_client = get_blob_service_client()
         self.container_client = self.blob_service_client.get_container_client(self.container_name)
         
         # Ensure container exists (it should already exist)
@@ -50,115 +54,241 @@ class QuoteImageGenerator:
     def _upload_image_to_blob(self, image_data: bytes, filename: str) -> str:
         """Upload image data to Azure Blob Storage"""
         try:
-            # Create blob path with folder
             blob_path = f"{self.blob_folder}/{filename}"
+            return get_blob_uploader().upload(blob_path, image_data, self._image_content_type())
             
-            # Upload the image
-            blob_client = self.container_client.get_blob_client(blob_path)
-            blob_client.upload_blob(image_data, overwrite=True)
-            
-            # Return the blob URL
-            blob_url = f"https://{self.blob_service_client.account_name}.blob.core.windows.net/{self.container_name}/{blob_path}"
-            return blob_url
+        except Exception as e:
+            raise Exception(f"Failed to upload image to blob storage: {str(e)}")
+    
+    async def _aupload_image_to_blob(self, image_data: bytes, filename: str) -> str:
+        """Upload image data to Azure Blob Storage asynchronously"""
+        try:
+            blob_path = f"{self.blob_folder}/{filename}"
+            return await get_blob_uploader().aupload(blob_path, image_data, self._image_content_type())
             
         except Exception as e:
             raise Exception(f"Failed to upload image to blob storage: {str(e)}")
     
     def _decode_image_to_bytes(self, b64_data: str) -> bytes:
-        """Decode base64 image data to bytes"""
+        """
+        Decode base64 image data to bytes
+        
+        The API already returns JPEG, so the bytes are passed through unchanged after a
+        header check; they are only re-encoded when a transcode policy is configured.
+        """
         try:
-            image = Image.open(BytesIO(base64.b64decode(b64_data)))
+            image_bytes = base64.b64decode(b64_data)
+        except Exception as e:
+            raise Exception(f"Failed to decode image: {str(e)}")
+        
+        if IMAGE_TRANSCODE_FORMAT or IMAGE_MAX_SIZE:
+            return self._transcode_image(image_bytes)
+        
+        if not image_bytes.startswith(JPEG_MAGIC):
+            raise Exception("Failed to decode image: response is not a JPEG")
+        
+        return image_bytes
+    
+    def _transcode_image(self, image_bytes: bytes) -> bytes:
+        """Re-encode image bytes according to IMAGE_TRANSCODE_FORMAT / IMAGE_MAX_SIZE"""
+        try:
+            image = Image.open(BytesIO(image_bytes))
+            
+            if IMAGE_MAX_SIZE and max(image.size) > IMAGE_MAX_SIZE:
+                image.thumbnail((IMAGE_MAX_SIZE, IMAGE_MAX_SIZE), Image.LANCZOS)
+            
+            output_format = IMAGE_TRANSCODE_FORMAT or "JPEG"
+            if output_format == "JPEG":
+                image = image.convert("RGB")
             
-            # Convert to bytes
             img_byte_arr = BytesIO()
-            image.save(img_byte_arr, format='JPEG', quality=90)
-            img_byte_arr.seek(0)
+            image.save(img_byte_arr, format=output_format, quality=IMAGE_TRANSCODE_QUALITY)
             
             return img_byte_arr.getvalue()
         except Exception as e:
-            raise Exception(f"Failed to decode image: {str(e)}")
+            raise Exception(f"Failed to transcode image: {str(e)}")
+    
+    def _image_extension(self) -> str:
+        """File extension for uploaded images under the current transcode policy"""
+        return (IMAGE_TRANSCODE_FORMAT or "JPEG").lower()
+    
+    def _image_content_type(self) -> str:
+        """MIME type of uploaded images under the current transcode policy"""
+        return f"image/{self._image_extension()}"
     
     def _build_image_prompt(self, quote_text: str, style: str = "paper") -> str:
         """Build the image generation prompt based on style"""
         template = IMAGE_STYLE_TEMPLATES.get(style, IMAGE_STYLE_TEMPLATES["paper"])
         return template.format(quote_text=quote_text).strip()
     
-    def generate_quote_image(self, quote_text: str, style: str = "paper") -> Tuple[str, str]:
+    def _build_generation_request(self, quote_text: str, style: str = "paper") -> Tuple[str, dict, dict]:
+        """Build the Azure OpenAI image generation request (url, headers, body)"""
+        # Build the custom prompt
+        custom_prompt = self._build_image_prompt(quote_text, style)
+        
+        # Build request URL
+        base_path = f'openai/deployments/{self.deployment}/images'
+        params = f'?api-version={self.api_version}'
+        generation_url = f"{self.endpoint}{base_path}/generations{params}"
+        
+        headers = {
+            'Api-Key': self.subscription_key,
+            'Content-Type': 'application/json',
+        }
+        
+        # Request body
+        generation_body = {
+            "prompt": custom_prompt,
+            "n": 1,
+            "size": "1024x1024",
+            "quality": "medium",
+            "output_format": "jpeg",
+        }
+        
+        return generation_url, headers, generation_body
+    
+    def _image_cache_key(self, generation_body: dict) -> str:
+        """Content address of the image a request would produce"""
+        return asset_key(
+            "image",
+            deployment=self.deployment,
+            request=generation_body,
+            transcode=(IMAGE_TRANSCODE_FORMAT, IMAGE_TRANSCODE_QUALITY, IMAGE_MAX_SIZE)
+        )
+    
+    def _extract_image_bytes(self, status_code: int, response_text: str, json_loader) -> Tuple[str, bytes]:
+        """Validate the generation response and return (filename, image_bytes)"""
+        # Check response
+        if status_code != 200:
+            raise Exception(f"API request failed with status {status_code}: {response_text}")
+        
+        # Parse response
+        try:
+            json_response = json_loader()
+        except Exception as e:
+            raise Exception(f"Failed to parse JSON response: {str(e)}")
+        
+        # Extract image data
+        if 'data' not in json_response or not json_response['data']:
+            raise Exception("No image data in response")
+        
+        # Get the first image
+        image_data = json_response['data'][0]
+        if 'b64_json' not in image_data:
+            raise Exception("No base64 image data in response")
+        
+        # Generate unique filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique_id = str(uuid.uuid4())[:8]
+        filename = f"quote_image_{timestamp}_{unique_id}.{self._image_extension()}"
+        
+        # Convert image to bytes
+        image_bytes = self._decode_image_to_bytes(image_data['b64_json'])
+        
+        return filename, image_bytes
+    
+    def generate_quote_image(self, quote_text: str, style: str = "paper", force: bool = False) -> Tuple[str, str]:
         """
         Generate an image for the given quote and upload to Azure Blob Storage
         
         Args:
             quote_text: The complete quote text (content only, no title)
             style: Image style (paper, modern, minimal)
+            force: Generate a new image even if an identical one was uploaded before
             
         Returns:
             Tuple of (image_filename, blob_url)
         """
         try:
-            # Build the custom prompt
-            custom_prompt = self._build_image_prompt(quote_text, style)
-            
-            # Build request URL
-            base_path = f'openai/deployments/{self.deployment}/images'
-            params = f'?api-version={self.api_version}'
-            generation_url = f"{self.endpoint}{base_path}/generations{params}"
-            
-            # Request body
-            generation_body = {
-                "prompt": custom_prompt,
-                "n": 1,
-                "size": "1024x1024",
-                "quality": "medium",
-                "output_format": "jpeg",
-            }
+            generation_url, headers, generation_body = self._build_generation_request(quote_text, style)
+            cache_key = self._image_cache_key(generation_body)
+            cached = None if force else get_asset_cache().get(cache_key)
+            if cached is not None:
+                print(f"♻️ Reusing cached image: {cached['url']}")
+                return cached["filename"], cached["url"]
             
             # Call Azure OpenAI API
-            generation_response = requests.post(
+            generation_response = get_session().post(
                 generation_url,
-                headers={
-                    'Api-Key': self.subscription_key,
-                    'Content-Type': 'application/json',
-                },
+                headers=headers,
                 json=generation_body,
                 timeout=60  # 60 second timeout
             )
             
-            # Check response
-            if generation_response.status_code != 200:
-                raise Exception(f"API request failed with status {generation_response.status_code}: {generation_response.text}")
+            filename, image_bytes = self._extract_image_bytes(
+                generation_response.status_code, generation_response.text, generation_response.json
+            )
             
-            # Parse response
-            try:
-                json_response = generation_response.json()
-            except Exception as e:
-                raise Exception(f"Failed to parse JSON response: {str(e)}")
+            # Upload to Azure Blob Storage
+            blob_url = self._upload_image_to_blob(image_bytes, filename)
+            get_asset_cache().put(cache_key, "image", filename, blob_url, len(image_bytes), image_bytes)
             
-            # Extract image data
-            if 'data' not in json_response or not json_response['data']:
-                raise Exception("No image data in response")
+            return filename, blob_url
             
-            # Get the first image
-            image_data = json_response['data'][0]
-            if 'b64_json' not in image_data:
-                raise Exception("No base64 image data in response")
+        except Exception as e:
+            raise Exception(f"Image generation failed: {str(e)}")
+    
+    async def agenerate_quote_image(self, quote_text: str, style: str = "paper", force: bool = False) -> Tuple[str, str]:
+        """
+        Async version of generate_quote_image that does not block the event loop
+        
+        Args:
+            quote_text: The complete quote text (content only, no title)
+            style: Image style (paper, modern, minimal)
+            force: Generate a new image even if an identical one was uploaded before
             
-            # Generate unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            unique_id = str(uuid.uuid4())[:8]
-            filename = f"quote_image_{timestamp}_{unique_id}.jpeg"
+        Returns:
+            Tuple of (image_filename, blob_url)
+        """
+        filename, blob_url, _ = await self.agenerate_quote_image_with_bytes(quote_text, style, force)
+        return filename, blob_url
+    
+    async def agenerate_quote_image_with_bytes(self, quote_text: str, style: str = "paper",
+                                               force: bool = False) -> Tuple[str, str, bytes]:
+        """
+        Generate and upload a quote image, also returning the uploaded bytes
+        
+        Lets later stages (video rendering) use the image without downloading it back.
+        
+        Returns:
+            Tuple of (image_filename, blob_url, image_bytes)
+        """
+        try:
+            generation_url, headers, generation_body = self._build_generation_request(quote_text, style)
+            cache_key = self._image_cache_key(generation_body)
+            loop = asyncio.get_running_loop()
+            cached = None if force else await loop.run_in_executor(None, get_asset_cache().get, cache_key)
+            if cached is not None and cached["data"] is not None:
+                print(f"♻️ Reusing cached image: {cached['url']}")
+                return cached["filename"], cached["url"], cached["data"]
             
-            # Convert image to bytes
-            image_bytes = self._decode_image_to_bytes(image_data['b64_json'])
+            # Call Azure OpenAI API
+            generation_response = await get_async_client().post(
+                generation_url,
+                headers=headers,
+                json=generation_body,
+                timeout=60
+            )
             
-            # Upload to Azure Blob Storage
-            blob_url = self._upload_image_to_blob(image_bytes, filename)
+            # Decoding is CPU work, keep it off the event loop
+            filename, image_bytes = await loop.run_in_executor(
+                None,
+                self._extract_image_bytes,
+                generation_response.status_code, generation_response.text, generation_response.json
+            )
             
-            return filename, blob_url
+            blob_url = await self._aupload_image_to_blob(image_bytes, filename)
+            await loop.run_in_executor(
+                None, get_asset_cache().put, cache_key, "image", filename, blob_url, len(image_bytes), image_bytes
+            )
+            
+            return filename, blob_url, image_bytes
             
         except Exception as e:
             raise Exception(f"Image generation failed: {str(e)}")
     
-    def generate_quote_image_safe(self, quote_text: str, style: str = "paper") -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    def generate_quote_image_safe(self, quote_text: str, style: str = "paper",
+                                  force: bool = False) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """
         Safe version of generate_quote_image that returns error instead of raising
         
@@ -166,7 +296,35 @@ class QuoteImageGenerator:
             Tuple of (filename, blob_url, error_message)
         """
         try:
-            filename, blob_url = self.generate_quote_image(quote_text, style)
+            filename, blob_url = self.generate_quote_image(quote_text, style, force)
             return filename, blob_url, None
         except Exception as e:
             return None, None, str(e)
+    
+    async def agenerate_quote_image_safe(self, quote_text: str, style: str = "paper",
+                                         force: bool = False) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Safe version of agenerate_quote_image that returns error instead of raising
+        
+        Returns:
+            Tuple of (filename, blob_url, error_message)
+        """
+        try:
+            filename, blob_url = await self.agenerate_quote_image(quote_text, style, force)
+            return filename, blob_url, None
+        except Exception as e:
+            return None, None, str(e)
+    
+    async def agenerate_quote_image_with_bytes_safe(self, quote_text: str, style: str = "paper",
+                                                    force: bool = False) -> Tuple[Optional[str], Optional[str], Optional[bytes], Optional[str]]:
+        """
+        Safe version of agenerate_quote_image_with_bytes that returns error instead of raising
+        
+        Returns:
+            Tuple of (filename, blob_url, image_bytes, error_message)
+        """
+        try:
+            filename, blob_url, image_bytes = await self.agenerate_quote_image_with_bytes(quote_text, style, force)
+            return filename, blob_url, image_bytes, None
+        except Exception as e:
+            return None, None, None, str(e)
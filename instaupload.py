@@ -1,21 +1,46 @@
-from config import BASE_URL, ACCESS_TOKEN, INSTAGRAM_USER_ID
-from typing import Any, Dict, Optional, Tuple
-import requests
+from config import (
+    BASE_URL, ACCESS_TOKEN, INSTAGRAM_USER_ID,
+    CONTAINER_POLL_INITIAL_DELAY, CONTAINER_POLL_MAX_DELAY, CONTAINER_POLL_BACKOFF, HTTP_TIMEOUT,
+    INSTAGRAM_INSIGHT_METRICS
+)
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import asyncio
+import threading
 import time
+
+from http_clients import get_session, get_async_client
+
+
+class ContainerAlreadyPublishedError(Exception):
+    """Raised when resuming a publish whose container was already published"""
+
+
 class InstagramReelsAPI:
     def __init__(self, access_token: str, instagram_user_id: str):
         self.access_token = access_token
         self.instagram_user_id = instagram_user_id
         self.base_url = BASE_URL
         
-    def create_reel_container(
-        self, 
-        video_url: str, 
+    def _poll_delays(self, max_wait_minutes: int) -> Iterator[float]:
+        """Yield sleep intervals: short first polls, growing up to the max delay, within the time budget"""
+        budget = max_wait_minutes * 60
+        delay = CONTAINER_POLL_INITIAL_DELAY
+        waited = 0.0
+        
+        while waited < budget:
+            step = min(delay, CONTAINER_POLL_MAX_DELAY, budget - waited)
+            yield step
+            waited += step
+            delay *= CONTAINER_POLL_BACKOFF
+    
+    def _build_container_payload(
+        self,
+        video_url: str,
         caption: str = "",
         share_to_feed: bool = True,
         thumb_offset: Optional[int] = None,
         location_id: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> Tuple[str, Dict[str, Any]]:
         endpoint = f"{self.base_url}/{self.instagram_user_id}/media"
         
         payload = {
@@ -32,7 +57,21 @@ class InstagramReelsAPI:
         if location_id:
             payload["location_id"] = location_id
         
-        response = requests.post(endpoint, json=payload)
+        return endpoint, payload
+    
+    def create_reel_container(
+        self, 
+        video_url: str, 
+        caption: str = "",
+        share_to_feed: bool = True,
+        thumb_offset: Optional[int] = None,
+        location_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        endpoint, payload = self._build_container_payload(
+            video_url, caption, share_to_feed, thumb_offset, location_id
+        )
+        
+        response = get_session().post(endpoint, json=payload, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
         
         return response.json()
@@ -45,28 +84,24 @@ class InstagramReelsAPI:
             "access_token": self.access_token
         }
         
-        response = requests.get(endpoint, params=params)
+        response = get_session().get(endpoint, params=params, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
         
         result = response.json()
         return result.get("status_code", "UNKNOWN")
     
     def wait_for_container_ready(self, container_id: str, max_wait_minutes: int = 5) -> bool:
-        max_attempts = max_wait_minutes
-        
-        for attempt in range(max_attempts):
+        for delay in self._poll_delays(max_wait_minutes):
             status = self.check_container_status(container_id)
             
             if status == "FINISHED":
                 return True
             elif status in ["ERROR", "EXPIRED"]:
                 return False
-            elif status == "IN_PROGRESS":
-                time.sleep(60)  # Wait 60 seconds
-            else:
-                time.sleep(60)
+            
+            time.sleep(delay)
         
-        return False
+        return self.check_container_status(container_id) == "FINISHED"
     
     def publish_reel(self, container_id: str) -> Dict[str, Any]:
         endpoint = f"{self.base_url}/{self.instagram_user_id}/media_publish"
@@ -76,7 +111,7 @@ class InstagramReelsAPI:
             "access_token": self.access_token
         }
         
-        response = requests.post(endpoint, json=payload)
+        response = get_session().post(endpoint, json=payload, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
         
         return response.json()
@@ -112,6 +147,140 @@ class InstagramReelsAPI:
             "media_id": publish_result["id"],
             "status": "published"
         }
+    
+    # Async variants - safe to call from request handlers without blocking the event loop
+    
+    async def acreate_reel_container(
+        self,
+        video_url: str,
+        caption: str = "",
+        share_to_feed: bool = True,
+        thumb_offset: Optional[int] = None,
+        location_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        endpoint, payload = self._build_container_payload(
+            video_url, caption, share_to_feed, thumb_offset, location_id
+        )
+        
+        response = await get_async_client().post(endpoint, json=payload)
+        response.raise_for_status()
+        
+        return response.json()
+    
+    async def acheck_container_status(self, container_id: str) -> str:
+        endpoint = f"{self.base_url}/{container_id}"
+        
+        params = {
+            "fields": "status_code",
+            "access_token": self.access_token
+        }
+        
+        response = await get_async_client().get(endpoint, params=params)
+        response.raise_for_status()
+        
+        result = response.json()
+        return result.get("status_code", "UNKNOWN")
+    
+    async def await_container_ready(self, container_id: str, max_wait_minutes: int = 5) -> bool:
+        for delay in self._poll_delays(max_wait_minutes):
+            status = await self.acheck_container_status(container_id)
+        
+            if status == "FINISHED":
+                return True
+            elif status in ["ERROR", "EXPIRED"]:
+                return False
+        
+            await asyncio.sleep(delay)
+        
+        return await self.acheck_container_status(container_id) == "FINISHED"
+    
+    async def apublish_reel(self, container_id: str) -> Dict[str, Any]:
+        endpoint = f"{self.base_url}/{self.instagram_user_id}/media_publish"
+        
+        payload = {
+            "creation_id": container_id,
+            "access_token": self.access_token
+        }
+        
+        response = await get_async_client().post(endpoint, json=payload)
+        response.raise_for_status()
+        
+        return response.json()
+    
+    async def aget_media_insights(self, media_id: str) -> Dict[str, int]:
+        """Fetch engagement metrics for a published reel as {metric_name: value}"""
+        endpoint = f"{self.base_url}/{media_id}/insights"
+        
+        params = {
+            "metric": ",".join(INSTAGRAM_INSIGHT_METRICS),
+            "access_token": self.access_token
+        }
+        
+        response = await get_async_client().get(endpoint, params=params)
+        response.raise_for_status()
+        
+        metrics = {}
+        for item in response.json().get("data", []):
+            values = item.get("values") or [{}]
+            metrics[item.get("name")] = int(values[0].get("value", 0) or 0)
+        return metrics
+    
+    async def aupload_reel_complete(
+        self,
+        video_url: str,
+        caption: str = "",
+        share_to_feed: bool = True,
+        thumb_offset: Optional[int] = None,
+        location_id: Optional[str] = None,
+        container_id: Optional[str] = None,
+        on_container_created: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Create, wait for and publish a reel
+        
+        Pass container_id to resume an interrupted upload with its existing container;
+        a container that was already published raises ContainerAlreadyPublishedError
+        instead of being published twice. on_container_created is called with the new
+        container ID before anything else happens, so callers can persist it.
+        """
+        if container_id is None:
+            # Step 1: Create container
+            container_result = await self.acreate_reel_container(
+                video_url=video_url,
+                caption=caption,
+                share_to_feed=share_to_feed,
+                thumb_offset=thumb_offset,
+                location_id=location_id
+            )
+            
+            container_id = container_result["id"]
+            if on_container_created:
+                on_container_created(container_id)
+        elif await self.acheck_container_status(container_id) == "PUBLISHED":
+            raise ContainerAlreadyPublishedError(f"Container {container_id} was already published")
+        
+        # Step 2: Wait for ready
+        if not await self.await_container_ready(container_id):
+            raise Exception("Container failed to become ready for publishing")
+        
+        # Step 3: Publish
+        publish_result = await self.apublish_reel(container_id)
+        
+        return {
+            "container_id": container_id,
+            "media_id": publish_result["id"],
+            "status": "published"
+        }
+
+
+_api_client: Optional[InstagramReelsAPI] = None
+_api_client_lock = threading.Lock()
+
 
-# Initialize API client
-api_client = InstagramReelsAPI(ACCESS_TOKEN, INSTAGRAM_USER_ID)
\ No newline at end of file
+def get_api_client() -> InstagramReelsAPI:
+    """Shared Instagram API client for the configured account"""
+    global _api_client
+    with _api_client_lock:
+        if _api_client is None:
+            _api_client = InstagramReelsAPI(ACCESS_TOKEN, INSTAGRAM_USER_ID)
+        return _api_client
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Background job queue for long-running operations (generation, rendering, publishing)
+
+Jobs are persisted in SQLite so queued and interrupted work is picked up again
+after a restart, and executed by a bounded pool of asyncio workers. Handlers with
+side effects that must not be repeated (e.g. publishing) record how far they got
+in the job's checkpoint and resume from it instead of starting over.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from config import JOBS_DB_PATH, JOB_WORKERS
+
+
+# Handler signature: (payload, progress, checkpoint) -> result, where progress(stage, fraction)
+# reports status and checkpoint persists resume state
+ProgressCallback = Callable[[str, float], None]
+JobHandler = Callable[[Dict[str, Any], ProgressCallback, "JobCheckpoint"], Awaitable[Dict[str, Any]]]
+
+FINAL_STATUSES = ("completed", "failed")
+
+
+class JobStore:
+    """SQLite persistence for job records"""
+
+    def __init__(self, db_path: str = JOBS_DB_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                checkpoint TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "checkpoint" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN checkpoint TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["checkpoint"] = json.loads(job["checkpoint"]) if job["checkpoint"] else {}
+        return job
+
+    def create(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.now().isoformat()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "stage": None,
+            "progress": 0.0,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "checkpoint": {},
+            "created_at": now,
+            "updated_at": now
+        }
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, stage, progress, payload, result, error, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job["job_id"], kind, job["status"], None, 0.0, json.dumps(payload), None, None, now, now)
+            )
+            self._conn.commit()
+        return job
+
+    def update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = datetime.now().isoformat()
+        for name in ("result", "checkpoint"):
+            if fields.get(name) is not None:
+                fields[name] = json.dumps(fields[name])
+
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def unfinished(self) -> List[str]:
+        """IDs of jobs that were queued or interrupted mid-run, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row["job_id"] for row in rows]
+
+
+class JobCheckpoint:
+    """Resume state of one job, persisted on every save"""
+
+    def __init__(self, store: JobStore, job_id: str, data: Optional[Dict[str, Any]] = None):
+        self.store = store
+        self.job_id = job_id
+        self.data: Dict[str, Any] = dict(data or {})
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.data.get(name, default)
+
+    def save(self, **fields) -> None:
+        """Merge fields into the checkpoint and persist it before returning"""
+        self.data.update(fields)
+        self.store.update(self.job_id, checkpoint=self.data)
+
+
+class JobManager:
+    """Persistent job queue executed by a bounded pool of asyncio workers"""
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = JOB_WORKERS):
+        self.store = store or JobStore()
+        self.workers = max(1, workers)
+        self.handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._changed: Optional[asyncio.Condition] = None
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine function that executes jobs of the given kind"""
+        self.handlers[kind] = handler
+
+    async def start(self) -> None:
+        """Start the worker pool and re-queue jobs left over from a previous run"""
+        if self._worker_tasks:
+            return
+
+        self._queue = asyncio.Queue()
+        self._changed = asyncio.Condition()
+
+        for job_id in self.store.unfinished():
+            self.store.update(job_id, status="queued")
+            self._queue.put_nowait(job_id)
+
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the worker pool; running jobs are resumed on the next start"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        """
+        Persist a job and queue it for execution
+
+        Args:
+            kind: Job type, must have a registered handler
+            payload: JSON-serializable handler arguments
+
+        Returns:
+            The new job ID
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        if self._queue is None:
+            raise RuntimeError("Job manager is not started")
+
+        job = self.store.create(kind, payload)
+        self._queue.put_nowait(job["job_id"])
+        return job["job_id"]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current state of a job, or None if unknown"""
+        return self.store.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job state each time it changes, until it completes or fails"""
+        last_seen = None
+        while True:
+            job = self.store.get(job_id)
+            if job is None:
+                return
+            if job["updated_at"] != last_seen:
+                last_seen = job["updated_at"]
+                yield job
+            if job["status"] in FINAL_STATUSES:
+                return
+
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=15)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _update(self, job_id: str, **fields) -> None:
+        self.store.update(job_id, **fields)
+        asyncio.get_running_loop().create_task(self._notify())
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        """Execute a single job and record its outcome"""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINAL_STATUSES:
+            return
+
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self._update(job_id, status="failed", error=f"No handler for job kind: {job['kind']}")
+            return
+
+        def progress(stage: str, fraction: float) -> None:
+            self._update(job_id, stage=stage, progress=round(min(max(fraction, 0.0), 1.0), 3))
+
+        self._update(job_id, status="running")
+        try:
+            checkpoint = JobCheckpoint(self.store, job_id, job["checkpoint"])
+            result = await handler(job["payload"], progress, checkpoint)
+            self._update(job_id, status="completed", stage="done", progress=1.0, result=result)
+        except asyncio.CancelledError:
+            # Left as 'running' so it is re-queued on the next start
+            raise
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e))
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Shared job manager; its job store is opened on first use"""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
+
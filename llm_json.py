@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tolerant JSON extraction from LLM responses
+
+Even in JSON mode, models occasionally wrap the payload in markdown fences or
+add a sentence before or after it. Instead of cleaning the text with string
+replacements, decode the first complete JSON value found in the response.
+JsonFieldStream reads string fields while the response is still streaming.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_decoder = json.JSONDecoder()
+
+
+def extract_json(text: str) -> Any:
+    """
+    Decode the first complete JSON object or array in text
+
+    Raises:
+        ValueError: If the text contains no decodable JSON value
+    """
+    text = text.strip()
+    try:
+        # Fast path: the whole response is the JSON payload
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # Scan for the first '{' or '[' that starts a complete value; trailing text is ignored
+    start = 0
+    while True:
+        positions = [pos for pos in (text.find("{", start), text.find("[", start)) if pos != -1]
+        if not positions:
+            raise ValueError("No JSON value found in model response")
+        start = min(positions)
+        try:
+            value, _ = _decoder.raw_decode(text, start)
+            return value
+        except json.JSONDecodeError:
+            start += 1
+
+
+def parse_model(text: str, model: Type[ModelT]) -> ModelT:
+    """
+    Extract JSON from text and validate it against a Pydantic model
+
+    Raises:
+        ValueError: If no JSON is found or it does not match the schema
+            (pydantic.ValidationError is a ValueError)
+    """
+    return model.model_validate(extract_json(text))
+
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonFieldStream:
+    """
+    Incremental reader for the string fields of a streamed top-level JSON object
+
+    Feed response chunks as they arrive. Each call returns (field, text, done)
+    events: decoded text deltas of top-level string values, then one event with
+    done=True and the complete value once the closing quote is seen. Nested and
+    non-string values are skipped, as is anything before the opening brace.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape: Optional[str] = None  # characters after a backslash, None outside an escape
+        self._expect_key = False
+        self._is_key = False
+        self._key = ""
+        self._field: Optional[str] = None  # top-level key whose string value is being read
+        self._value: List[str] = []
+        self._delta: List[str] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, bool]]:
+        events: List[Tuple[str, str, bool]] = []
+        for char in chunk:
+            if self._in_string:
+                self._read_string_char(char, events)
+            elif char == '"':
+                self._in_string = True
+                self._is_key = self._depth == 1 and self._expect_key
+                if self._is_key:
+                    self._key = ""
+            elif char in "{[":
+                self._depth += 1
+                self._expect_key = self._depth == 1 and char == "{"
+            elif char in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and char == ",":
+                self._expect_key = True
+                self._field = None
+            elif self._depth == 1 and char == ":":
+                self._expect_key = False
+                self._field = self._key
+        self._flush(events)
+        return events
+
+    def _reading_value(self) -> bool:
+        return self._depth == 1 and not self._is_key and self._field is not None
+
+    def _read_string_char(self, char: str, events: List[Tuple[str, str, bool]]) -> None:
+        if self._escape is not None:
+            self._escape += char
+            if self._escape[0] == "u":
+                if len(self._escape) < 5:
+                    return
+                decoded = chr(int(self._escape[1:], 16))
+            else:
+                decoded = _ESCAPES.get(self._escape, self._escape)
+            self._escape = None
+            self._append(decoded)
+        elif char == "\\":
+            self._escape = ""
+        elif char == '"':
+            self._in_string = False
+            if self._reading_value():
+                self._flush(events)
+                events.append((self._field, "".join(self._value), True))
+                self._value.clear()
+                self._field = None
+        else:
+            self._append(char)
+
+    def _append(self, text: str) -> None:
+        if self._is_key:
+            self._key += text
+        elif self._reading_value():
+            self._value.append(text)
+            self._delta.append(text)
+
+    def _flush(self, events: List[Tuple[str, str, bool]]) -> None:
+        if self._delta:
+            events.append((self._field, "".join(self._delta), False))
+            self._delta.clear()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Prompt-cache accounting for LLM calls
+
+Providers with automatic prefix caching report how many prompt tokens were
+served from cache. Recording that per call shows whether the stable prompt
+prefix (system prompt + output rules) is actually being reused.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+from config import LLM_METRICS_RECENT_CALLS
+
+
+def _cached_tokens(usage: Dict[str, Any]) -> int:
+    details = usage.get("input_token_details") or {}
+    return int(details.get("cache_read") or 0)
+
+
+class PromptCacheMetrics:
+    """Totals and recent per-call counts of cached vs uncached prompt tokens"""
+
+    def __init__(self, recent: int = LLM_METRICS_RECENT_CALLS):
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._prompt_tokens = 0
+        self._cached_tokens = 0
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=recent)
+
+    def record(self, kind: str, message: Any) -> None:
+        """Record the usage reported on an AIMessage (or final stream chunk), if any"""
+        usage = getattr(message, "usage_metadata", None)
+        if not usage:
+            return
+        prompt_tokens = int(usage.get("input_tokens") or 0)
+        cached = _cached_tokens(usage)
+        with self._lock:
+            self._calls += 1
+            self._prompt_tokens += prompt_tokens
+            self._cached_tokens += cached
+            self._recent.append({
+                "kind": kind,
+                "prompt_tokens": prompt_tokens,
+                "cached_tokens": cached,
+                "uncached_tokens": prompt_tokens - cached
+            })
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "prompt_tokens": self._prompt_tokens,
+                "cached_tokens": self._cached_tokens,
+                "uncached_tokens": self._prompt_tokens - self._cached_tokens,
+                "cache_hit_ratio": round(self._cached_tokens / self._prompt_tokens, 3) if self._prompt_tokens else 0.0,
+                "recent": list(self._recent)
+            }
+
+
+# Global prompt cache metrics
+llm_metrics = PromptCacheMetrics()
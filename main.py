@@ -3,15 +3,56 @@
 Gen Z Quote Generator - Simplified API with modular architecture
 """
 
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional
+import json
+
+from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from fastapi_mcp import FastApiMCP
+import httpx
 import requests
 import uvicorn
 import os
 from config import ACCESS_TOKEN, BASE_URL, INSTAGRAM_USER_ID
-from instaupload import InstagramReelsAPI  , api_client
-from models import QuickReelRequest, QuoteRequest, QuoteResponse, ReelUploadRequest, ReelUploadResponse, StatusResponse
+from instaupload import InstagramReelsAPI  , get_api_client
+from jobs import JobCheckpoint, get_job_manager
+from models import (
+    BatchPipelineItem, BatchPipelineRequest, BatchQuoteRequest, BatchQuoteResponse, JobStatusResponse,
+    EngagementUpdate, QuotePage, SearchResponse, StoredQuoteResponse, JobSubmitResponse, QuickReelRequest, QuoteRequest, QuoteResponse,
+    ReelUploadRequest, ReelUploadResponse, StatusResponse
+)
 from quote_generator import ViralQuoteGenerator
+from batch_pipeline import BatchPipeline
+from engagement import EngagementTracker
+from render_pool import render_pool
+from llm_cache import get_llm_cache
+from asset_cache import get_asset_cache
+from llm_metrics import llm_metrics
+import http_clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the generator and start and stop the background job workers with the server"""
+    global generator, batch_pipeline, engagement_tracker
+    generator = ViralQuoteGenerator()
+    batch_pipeline = BatchPipeline(generator)
+    engagement_tracker = EngagementTracker(generator.store, generator.trending, get_api_client())
+    job_manager = get_job_manager()
+    job_manager.register("generate", run_generate_job)
+    job_manager.register("upload", run_upload_job)
+    await job_manager.start()
+    engagement_tracker.start()
+    if generator.pool is not None:
+        generator.pool.start()
+    yield
+    if generator.pool is not None:
+        await generator.pool.stop()
+    await engagement_tracker.stop()
+    await job_manager.stop()
+    render_pool.shutdown()
+    await http_clients.aclose()
 
 
 # Create FastAPI app
@@ -20,11 +61,15 @@ app = FastAPI(
     description="AI-powered viral motivational quote generator",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
-# Global generator instance
-generator = ViralQuoteGenerator()
+# Global generator instance, created in lifespan: spawned render workers re-import this
+# module as __mp_main__ and must not build generators, open stores or call Blob Storage
+generator: Optional[ViralQuoteGenerator] = None
+batch_pipeline: Optional[BatchPipeline] = None
+engagement_tracker: Optional[EngagementTracker] = None
 
 
 def get_generator() -> ViralQuoteGenerator:
@@ -32,41 +77,12 @@ def get_generator() -> ViralQuoteGenerator:
     return generator
 
 
-@app.post("/generate", 
-         operation_id="generate_viral_quote",
-         summary="Generate viral Gen Z motivational quotes with captions, images and videos",
-         description="Generate viral quotes with AI-powered captions, hashtags, customizable themes, optional image generation, and video creation with AI-generated titles",
-         response_model=QuoteResponse)
-async def generate_quote(
+async def _generate_quote_response(
     request: QuoteRequest,
-    gen: ViralQuoteGenerator = Depends(get_generator)
+    gen: ViralQuoteGenerator,
+    progress: Optional[Callable[[str, float], None]] = None
 ) -> QuoteResponse:
-    """
-    Generate a single viral Gen Z motivational quote using AI, with optional image and video generation.
-    
-    This tool creates authentic, shareable quotes that resonate with today's generation.
-    Uses LangChain and OpenAI to generate unique, viral-optimized content.
-    Optionally generates beautiful motivational images using Azure OpenAI DALL-E.
-    Optionally creates engaging videos using MoviePy for social media.
-    
-    Inputs:
-    - theme: The quote theme - 'relationships', 'self-worth', 'money', 'boundaries', 'growth', or 'mixed'
-    - target_audience: Target demographic - 'gen-z', 'millennials', 'empaths', 'introverts', 'overthinkers'
-    - format_preference: Optional title format preference
-    - image: Whether to generate an image (default: false)
-    - image_style: Image style - 'paper', 'modern', 'minimal' (default: 'paper')
-    - video: Whether to generate a video (requires image=true, default: false)
-    - video_title: Custom video title (defaults to 'Daily Vibe')
-    
-    Returns:
-    - A complete AI-generated quote with title, content, theme, audience, and timestamp
-    - Image filename and URL (if image generation requested and successful)
-    - Video filename and URL (if video generation requested and successful)
-    
-    Example:
-    Input: {"theme": "relationships", "target_audience": "empaths", "image": true, "video": true}
-    Output: {"title": "Maturity is when", "content": "...", "image_url": "...", "video_url": "..."}
-    """
+    """Run the generation pipeline selected by the request flags"""
     if request.video and not request.image:
         # Video requires image, so enable image generation
         request.image = True
@@ -78,10 +94,14 @@ async def generate_quote(
             theme=request.theme,
             target_audience=request.target_audience,
             format_preference=request.format_preference,
-            image_style=request.image_style
+            image_style=request.image_style,
+            progress=progress,
+            deterministic=request.deterministic,
+            force=request.force
         )
         
         return QuoteResponse(
+            id=quote.id,
             title=quote.title,
             content=quote.content,
             theme=quote.theme,
@@ -95,14 +115,18 @@ async def generate_quote(
         )
     elif request.image:
         # Generate quote with image only
-        quote, filename, blob_url, error = gen.generate_quote_with_image(
+        quote, filename, blob_url, error = await gen.agenerate_quote_with_image(
             theme=request.theme,
             target_audience=request.target_audience,
             format_preference=request.format_preference,
-            image_style=request.image_style
+            image_style=request.image_style,
+            progress=progress,
+            deterministic=request.deterministic,
+            force=request.force
         )
         
         return QuoteResponse(
+            id=quote.id,
             title=quote.title,
             content=quote.content,
             theme=quote.theme,
@@ -116,13 +140,15 @@ async def generate_quote(
         )
     else:
         # Just generate quote without image
-        quote = gen.generate_quote(
+        quote = await gen.agenerate_quote(
             theme=request.theme,
             target_audience=request.target_audience,
-            format_preference=request.format_preference
+            format_preference=request.format_preference,
+            deterministic=request.deterministic
         )
         
         return QuoteResponse(
+            id=quote.id,
             title=quote.title,
             content=quote.content,
             theme=quote.theme,
@@ -136,6 +162,321 @@ async def generate_quote(
         )
 
 
+async def run_generate_job(payload: dict, progress: Callable[[str, float], None],
+                           checkpoint: JobCheckpoint) -> dict:
+    """Job handler: run a /generate request in the background"""
+    response = await _generate_quote_response(QuoteRequest(**payload), generator, progress)
+    return response.model_dump()
+
+
+async def run_upload_job(payload: dict, progress: Callable[[str, float], None],
+                         checkpoint: JobCheckpoint) -> dict:
+    """
+    Job handler: create, wait for and publish an Instagram Reel
+    
+    Publishing is not idempotent, so the container ID and the publish result are
+    checkpointed; a job interrupted by a restart resumes with its container (or
+    reuses the recorded result) instead of publishing a second reel.
+    """
+    published = checkpoint.get("published")
+    if published is None:
+        progress("publishing", 0.1)
+        published = await get_api_client().aupload_reel_complete(
+            container_id=checkpoint.get("container_id"),
+            on_container_created=lambda container_id: checkpoint.save(container_id=container_id),
+            **payload
+        )
+        checkpoint.save(published=published)
+    _record_published(payload["video_url"], published["media_id"])
+    return published
+
+
+async def _publish_reel(**kwargs) -> dict:
+    """Publish a reel and link the resulting media to its quote for engagement tracking"""
+    result = await get_api_client().aupload_reel_complete(**kwargs)
+    _record_published(kwargs["video_url"], result["media_id"])
+    return result
+
+
+def _record_published(video_url: str, media_id: str) -> None:
+    """Link a published reel to its quote; the reel is already live, so failures are only logged"""
+    try:
+        engagement_tracker.record_published(video_url, media_id)
+    except Exception as e:
+        print(f"⚠️ Could not record published media {media_id} for engagement tracking: {str(e)}")
+
+
+@app.post("/generate", 
+         operation_id="generate_viral_quote",
+         summary="Generate viral Gen Z motivational quotes with captions, images and videos",
+         description="Generate viral quotes with AI-powered captions, hashtags, customizable themes, optional image generation, and video creation with AI-generated titles",
+         response_model=QuoteResponse)
+async def generate_quote(
+    request: QuoteRequest,
+    gen: ViralQuoteGenerator = Depends(get_generator)
+) -> QuoteResponse:
+    """
+    Generate a single viral Gen Z motivational quote using AI, with optional image and video generation.
+    
+    This tool creates authentic, shareable quotes that resonate with today's generation.
+    Uses LangChain and OpenAI to generate unique, viral-optimized content.
+    Optionally generates beautiful motivational images using Azure OpenAI DALL-E.
+    Optionally creates engaging videos using MoviePy for social media.
+    
+    Inputs:
+    - theme: The quote theme - 'relationships', 'self-worth', 'money', 'boundaries', 'growth', or 'mixed'
+    - target_audience: Target demographic - 'gen-z', 'millennials', 'empaths', 'introverts', 'overthinkers'
+    - format_preference: Optional title format preference
+    - image: Whether to generate an image (default: false)
+    - image_style: Image style - 'paper', 'modern', 'minimal' (default: 'paper')
+    - video: Whether to generate a video (requires image=true, default: false)
+    - video_title: Custom video title (defaults to 'Daily Vibe')
+    - deterministic: Reproducible quote for the same theme/audience/format (cached, default: false)
+    - force: Regenerate the image/video even if identical ones were made before (default: false)
+    
+    Returns:
+    - A complete AI-generated quote with title, content, theme, audience, and timestamp
+    - Image filename and URL (if image generation requested and successful)
+    - Video filename and URL (if video generation requested and successful)
+    
+    Example:
+    Input: {"theme": "relationships", "target_audience": "empaths", "image": true, "video": true}
+    Output: {"title": "Maturity is when", "content": "...", "image_url": "...", "video_url": "..."}
+    """
+    return await _generate_quote_response(request, gen)
+
+
+@app.get("/generate/stream",
+         operation_id="stream_viral_quote",
+         summary="Generate a viral quote, streaming tokens as Server-Sent Events",
+         description="Generate a single quote and stream the title and content tokens as the model produces them")
+async def stream_quote(
+    theme: str = Query("mixed", description="Theme for the quote"),
+    target_audience: str = Query("gen-z", description="Target audience"),
+    format_preference: Optional[str] = Query(None, description="Preferred format"),
+    gen: ViralQuoteGenerator = Depends(get_generator)
+):
+    """
+    Generate one quote (text only) and stream it as Server-Sent Events.
+    
+    Events:
+    - title: {"title": ...} as soon as the model has finished the title
+    - token: {"field": "content", "text": ...} for each content delta
+    - quote: the final QuoteResponse, stored and with caption
+    - error: {"error": ...} if generation failed
+    """
+    async def event_stream():
+        async for event in gen.astream_quote(theme, target_audience, format_preference):
+            event_type = event.pop("type")
+            if event_type == "quote":
+                quote = event["quote"]
+                event = QuoteResponse(
+                    id=quote.id,
+                    title=quote.title,
+                    content=quote.content,
+                    theme=quote.theme,
+                    target_audience=quote.target_audience,
+                    created_at=quote.created_at,
+                    caption=quote.caption
+                ).model_dump()
+            yield f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/generate/batch",
+          operation_id="generate_viral_quotes_batch",
+          summary="Generate many viral quotes in a few LLM calls",
+          description="Generate a batch of distinct viral quotes with captions, asking the model for several quotes per call",
+          response_model=BatchQuoteResponse)
+async def generate_quote_batch(
+    request: BatchQuoteRequest,
+    gen: ViralQuoteGenerator = Depends(get_generator)
+) -> BatchQuoteResponse:
+    """
+    Generate several distinct quotes at once (e.g. a week of content).
+    
+    The model is asked for a JSON array of quotes, BATCH_CHUNK_SIZE per call, with
+    chunks running concurrently; invalid or duplicate entries are dropped and topped up.
+    
+    Inputs:
+    - count: Number of quotes to generate
+    - theme, target_audience, format_preference: Same as /generate
+    
+    Returns:
+    - The generated quotes with captions, plus requested/generated counts
+    """
+    quotes = await gen.agenerate_quotes(
+        request.count,
+        theme=request.theme,
+        target_audience=request.target_audience,
+        format_preference=request.format_preference
+    )
+    
+    return BatchQuoteResponse(
+        requested=request.count,
+        generated=len(quotes),
+        quotes=[
+            QuoteResponse(
+                id=quote.id,
+                title=quote.title,
+                content=quote.content,
+                theme=quote.theme,
+                target_audience=quote.target_audience,
+                created_at=quote.created_at,
+                caption=quote.caption
+            )
+            for quote in quotes
+        ],
+        error=None if len(quotes) == request.count else f"Only {len(quotes)} of {request.count} quotes could be generated"
+    )
+
+
+@app.post("/generate/pipeline",
+          operation_id="generate_post_batch",
+          summary="Produce many finished posts (quote, image, video) concurrently",
+          description="Run a list of post specs through the quote, image, render and upload stages with per-stage concurrency limits, streaming items as they finish")
+async def generate_post_batch(request: BatchPipelineRequest):
+    """
+    Produce many finished posts at once, streamed as Server-Sent Events.
+    
+    Each item moves through LLM -> image -> render -> upload on its own, limited
+    per stage (many LLM calls, rate-limited image calls, CPU-bound renders).
+    
+    Events:
+    - item: a BatchPipelineItem, in completion order (use `index` to match specs)
+    - done: summary with completed/failed counts
+    """
+    async def event_stream():
+        completed = failed = 0
+        async for item in batch_pipeline.run(request.items):
+            if item["success"]:
+                completed += 1
+            else:
+                failed += 1
+            yield f"event: item\ndata: {json.dumps(BatchPipelineItem(**item).model_dump())}\n\n"
+        summary = {"requested": len(request.items), "completed": completed, "failed": failed}
+        yield f"event: done\ndata: {json.dumps(summary)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/search",
+         operation_id="search_quotes",
+         summary="Full-text search over generated quotes",
+         description="Search stored quotes by keywords with optional theme, audience and date filters",
+         response_model=SearchResponse)
+async def search_quotes(
+    query: str = Query(..., description="Search keywords (all must match, prefix matching)"),
+    theme: Optional[str] = Query(None, description="Optional theme filter"),
+    target_audience: Optional[str] = Query(None, description="Optional audience filter"),
+    since: Optional[str] = Query(None, description="Only quotes created at or after this ISO timestamp"),
+    until: Optional[str] = Query(None, description="Only quotes created before this ISO timestamp"),
+    limit: int = Query(10, ge=1, le=50, description="Number of results to return"),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    gen: ViralQuoteGenerator = Depends(get_generator)
+) -> SearchResponse:
+    """
+    Search every quote generated by this server, newest first.
+    
+    Titles and contents are indexed with SQLite FTS5; pages are fetched with a
+    cursor (the next_cursor of the previous page) instead of an offset.
+    """
+    quotes, next_cursor = gen.search_quotes(query, theme, target_audience, since, until, limit, cursor)
+    
+    return SearchResponse(
+        quotes=[StoredQuoteResponse(**quote) for quote in quotes],
+        next_cursor=next_cursor,
+        query=query
+    )
+
+
+@app.get("/themes/{theme}",
+         operation_id="get_quotes_by_theme",
+         summary="Get generated quotes by theme",
+         description="Get stored quotes for a theme, newest first, with cursor pagination",
+         response_model=QuotePage)
+async def get_quotes_by_theme(
+    theme: str,
+    limit: int = Query(10, ge=1, le=50, description="Number of quotes to return"),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    sort: str = Query("recent", pattern="^(recent|engagement)$", description="'recent' (paged) or 'engagement' (top only)"),
+    gen: ViralQuoteGenerator = Depends(get_generator)
+) -> QuotePage:
+    """Get stored quotes by theme"""
+    quotes, next_cursor = gen.get_quotes_by_theme(theme, limit, cursor, sort)
+    
+    return QuotePage(
+        quotes=[StoredQuoteResponse(**quote) for quote in quotes],
+        next_cursor=next_cursor
+    )
+
+
+@app.get("/trending",
+         operation_id="get_trending_quotes",
+         summary="Get the most engaging generated quotes",
+         description="Get stored quotes ordered by engagement score, optionally for one theme",
+         response_model=List[StoredQuoteResponse])
+async def get_trending_quotes(
+    limit: int = Query(10, ge=1, le=50, description="Number of trending quotes to return"),
+    theme: Optional[str] = Query(None, description="Optional theme filter"),
+    gen: ViralQuoteGenerator = Depends(get_generator)
+) -> List[StoredQuoteResponse]:
+    """Get stored quotes with the highest engagement score"""
+    return [StoredQuoteResponse(**quote) for quote in gen.get_trending_quotes(limit, theme)]
+
+
+@app.post("/quotes/{quote_id}/engagement",
+          operation_id="update_quote_engagement",
+          summary="Record engagement metrics for a quote",
+          response_model=StoredQuoteResponse)
+async def update_quote_engagement(quote_id: int, update: EngagementUpdate,
+                                  gen: ViralQuoteGenerator = Depends(get_generator)) -> StoredQuoteResponse:
+    """Store new engagement counters for a quote and update its trending position"""
+    if engagement_tracker.apply(quote_id, **update.model_dump()) is None:
+        raise HTTPException(status_code=404, detail=f"Quote not found: {quote_id}")
+    return StoredQuoteResponse(**gen.store.get(quote_id))
+
+
+@app.post("/engagement/refresh",
+          operation_id="refresh_engagement",
+          summary="Pull Instagram insights for published quotes now")
+async def refresh_engagement():
+    """Refresh engagement from Instagram insights for the least recently updated published quotes"""
+    refreshed = await engagement_tracker.refresh()
+    return {"refreshed": len(refreshed), "quote_ids": refreshed}
+
+
+@app.post("/jobs/generate",
+          operation_id="submit_generate_job",
+          summary="Queue a quote/image/video generation job",
+          description="Queue a generation request for background processing and return a job ID to poll",
+          response_model=JobSubmitResponse)
+async def submit_generate_job(request: QuoteRequest) -> JobSubmitResponse:
+    """
+    Queue a generation request (same inputs as /generate) and return immediately.
+    
+    Long image + video renders run on the background worker pool, so they survive
+    client disconnects. Poll GET /jobs/{job_id} or stream GET /jobs/{job_id}/events
+    for stage, progress and the final QuoteResponse.
+    """
+    job_id = get_job_manager().submit("generate", request.model_dump())
+    
+    return JobSubmitResponse(
+        job_id=job_id,
+        status="queued",
+        message="Generation queued"
+    )
+
+
 @app.get("/",
          operation_id="get_server_info",
          summary="Get server information",
@@ -150,6 +491,15 @@ async def root():
         "model": "gpt-4.1-mini",
         "endpoints": {
             "generate": "POST /generate - Generate AI quote with optional image and video",
+            "generate_stream": "GET /generate/stream - Stream a quote token by token (SSE)",
+            "generate_batch": "POST /generate/batch - Generate many quotes in a few LLM calls",
+            "generate_pipeline": "POST /generate/pipeline - Produce many posts concurrently (SSE stream)",
+            "search": "GET /search - Full-text search over generated quotes",
+            "themes": "GET /themes/{theme} - Generated quotes by theme",
+            "trending": "GET /trending - Most engaging generated quotes",
+            "generate_job": "POST /jobs/generate - Queue generation in the background",
+            "job_status": "GET /jobs/{job_id} - Job stage, progress and result",
+            "job_events": "GET /jobs/{job_id}/events - SSE job progress stream",
             "mcp": "GET /mcp - MCP endpoint for AI agents"
         },
         "themes": ["relationships", "self-worth", "money", "boundaries", "growth", "mixed"],
@@ -167,7 +517,7 @@ async def root():
             "videos": "video-gen"
         },
         "mcp_compatible": True,
-        "storage": "stateless - no database"
+        "storage": "SQLite quote store with full-text search"
     }
 
 
@@ -179,6 +529,9 @@ async def root():
         "endpoints": {
             "POST /upload": "Upload a reel with full options",
             "POST /quick-upload": "Quick upload with just video_url and caption",
+            "POST /upload/jobs": "Queue a reel upload and get a job ID",
+            "GET /jobs/{job_id}": "Check background job status",
+            "GET /jobs/{job_id}/events": "Stream background job progress (SSE)",
             "GET /status/{container_id}": "Check container status",
             "GET /health": "Health check"
         }
@@ -189,17 +542,33 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test API connectivity
-        response = requests.get(
+        response = await http_clients.get_async_client().get(
             f"{BASE_URL}/{INSTAGRAM_USER_ID}?fields=id&access_token={ACCESS_TOKEN}",
             timeout=10
         )
         if response.status_code == 200:
-            return {"status": "healthy", "instagram_api": "connected"}
+            return {"status": "healthy", "instagram_api": "connected", "render_pool": render_pool.stats(),
+                    "llm_prompt_cache": llm_metrics.stats(), "llm_response_cache": get_llm_cache().stats(),
+                    "asset_cache": get_asset_cache().stats()}
         else:
-            return {"status": "unhealthy", "instagram_api": "failed"}
+            return {"status": "unhealthy", "instagram_api": "failed", "render_pool": render_pool.stats(),
+                    "llm_prompt_cache": llm_metrics.stats(), "llm_response_cache": get_llm_cache().stats(),
+                    "asset_cache": get_asset_cache().stats()}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
 
+def _instagram_error_message(e: Exception) -> str:
+    """Build a readable error message from a failed Instagram API call"""
+    error_msg = f"API request failed: {str(e)}"
+    response = getattr(e, 'response', None)
+    if response is not None:
+        try:
+            error_detail = response.json()
+            error_msg = f"Instagram API Error: {error_detail.get('error', {}).get('message', str(e))}"
+        except:
+            error_msg = f"HTTP {response.status_code}: {response.text}"
+    return error_msg
+
 @app.post("/upload", response_model=ReelUploadResponse)
 async def upload_reel(request: ReelUploadRequest):
     """
@@ -212,7 +581,7 @@ async def upload_reel(request: ReelUploadRequest):
     - **location_id**: Facebook Page ID for location tagging
     """
     try:
-        result = api_client.upload_reel_complete(
+        result = await _publish_reel(
             video_url=str(request.video_url),
             caption=request.caption,
             share_to_feed=request.share_to_feed,
@@ -228,16 +597,8 @@ async def upload_reel(request: ReelUploadRequest):
             status=result["status"]
         )
         
-    except requests.exceptions.RequestException as e:
-        error_msg = f"API request failed: {str(e)}"
-        if hasattr(e, 'response') and e.response is not None:
-            try:
-                error_detail = e.response.json()
-                error_msg = f"Instagram API Error: {error_detail.get('error', {}).get('message', str(e))}"
-            except:
-                error_msg = f"HTTP {e.response.status_code}: {e.response.text}"
-        
-        raise HTTPException(status_code=400, detail=error_msg)
+    except (requests.exceptions.RequestException, httpx.HTTPError) as e:
+        raise HTTPException(status_code=400, detail=_instagram_error_message(e))
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
@@ -251,7 +612,7 @@ async def quick_upload_reel(request: QuickReelRequest):
     - **caption**: Caption for the reel
     """
     try:
-        result = api_client.upload_reel_complete(
+        result = await _publish_reel(
             video_url=str(request.video_url),
             caption=request.caption,
             share_to_feed=True
@@ -265,20 +626,68 @@ async def quick_upload_reel(request: QuickReelRequest):
             status=result["status"]
         )
         
-    except requests.exceptions.RequestException as e:
-        error_msg = f"API request failed: {str(e)}"
-        if hasattr(e, 'response') and e.response is not None:
-            try:
-                error_detail = e.response.json()
-                error_msg = f"Instagram API Error: {error_detail.get('error', {}).get('message', str(e))}"
-            except:
-                error_msg = f"HTTP {e.response.status_code}: {e.response.text}"
-        
-        raise HTTPException(status_code=400, detail=error_msg)
+    except (requests.exceptions.RequestException, httpx.HTTPError) as e:
+        raise HTTPException(status_code=400, detail=_instagram_error_message(e))
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+@app.post("/upload/jobs", response_model=JobSubmitResponse)
+async def submit_upload_job(request: ReelUploadRequest):
+    """
+    Queue an Instagram Reel upload and return immediately with a job ID
+    
+    The container is created, polled with adaptive backoff and published in the
+    background. Poll **GET /jobs/{job_id}** for the outcome.
+    """
+    job_id = get_job_manager().submit("upload", {
+        "video_url": str(request.video_url),
+        "caption": request.caption,
+        "share_to_feed": request.share_to_feed,
+        "thumb_offset": request.thumb_offset,
+        "location_id": request.location_id
+    })
+    
+    return JobSubmitResponse(
+        job_id=job_id,
+        status="queued",
+        message="Upload queued"
+    )
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """
+    Get the status and result of a background job
+    
+    - **job_id**: ID returned when the job was submitted
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    return JobStatusResponse(**job)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream job stage/progress updates as Server-Sent Events until the job finishes
+    
+    - **job_id**: ID returned when the job was submitted
+    """
+    if get_job_manager().get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    async def event_stream():
+        async for job in get_job_manager().watch(job_id):
+            state = JobStatusResponse(**job).model_dump()
+            yield f"event: {job['status']}\ndata: {json.dumps(state)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/status/{container_id}", response_model=StatusResponse)
 async def check_status(container_id: str):
     """
@@ -287,7 +696,7 @@ async def check_status(container_id: str):
     - **container_id**: ID of the container to check
     """
     try:
-        status = api_client.check_container_status(container_id)
+        status = await get_api_client().acheck_container_status(container_id)
         
         status_messages = {
             "FINISHED": "Container is ready for publishing",
@@ -312,7 +721,7 @@ async def create_container_only(request: ReelUploadRequest):
     Create container only (for manual publishing later)
     """
     try:
-        result = api_client.create_reel_container(
+        result = await get_api_client().acreate_reel_container(
             video_url=str(request.video_url),
             caption=request.caption,
             share_to_feed=request.share_to_feed,
@@ -336,14 +745,14 @@ async def publish_container(container_id: str):
     """
     try:
         # Check if container is ready
-        status = api_client.check_container_status(container_id)
+        status = await get_api_client().acheck_container_status(container_id)
         if status != "FINISHED":
             raise HTTPException(
                 status_code=400, 
                 detail=f"Container not ready. Status: {status}"
             )
         
-        result = api_client.publish_reel(container_id)
+        result = await get_api_client().apublish_reel(container_id)
         
         return {
             "success": True,
@@ -388,6 +797,8 @@ def main():
 
 🛠️  MCP Tools Available:
 ✅ generate_viral_quote - Generate AI quotes with captions, hashtags, images and videos
+✅ generate_viral_quotes_batch - Generate many quotes in a few LLM calls
+✅ stream_viral_quote - Stream a quote token by token (result is the SSE event log)
 ✅ get_server_info - Server information
 
 🔧 For Claude Desktop, add to config:
@@ -405,7 +816,7 @@ curl -X POST "http://{args.host}:{args.port}/generate" \\
      -H "Content-Type: application/json" \\
      -d '{{"theme": "relationships", "target_audience": "empaths", "image": true, "video": true}}'
 
-💾 Architecture: Modular, stateless, no database
+💾 Architecture: Modular, SQLite quote store with full-text search
 🧠 AI: LangChain + OpenAI GPT-4.1-mini
 🎨 Images: Azure OpenAI DALL-E + Azure Blob Storage
 🎬 Videos: MoviePy + Azure Blob Storage with AI-generated titles
@@ -3,23 +3,41 @@ Data models for the Gen Z Quote Generator
 """
 
 from dataclasses import dataclass
-from typing import Optional
-from pydantic import BaseModel, Field, HttpUrl
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
+
+from config import BATCH_MAX_QUOTES, PIPELINE_MAX_ITEMS
 
 
 @dataclass
 class Quote:
     """Quote data class"""
+    id: Optional[int] = None
     title: str = ""
     content: str = ""
     theme: str = "mixed"
     target_audience: str = "gen-z"
     created_at: Optional[str] = None
     caption: str = ""
+    error: Optional[str] = None  # set on the fallback quote when generation failed
+
+
+class QuoteDraft(BaseModel):
+    """Schema the LLM's JSON output is validated against"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    title: str = Field(min_length=1)
+    content: str = Field(min_length=1)
+
+
+class QuoteDraftBatch(BaseModel):
+    """Schema for batch generation output"""
+    quotes: List[Any] = Field(default_factory=list)
 
 
 class QuoteResponse(BaseModel):
     """Response model for quotes"""
+    id: Optional[int] = None
     title: str
     content: str
     theme: str
@@ -32,6 +50,37 @@ class QuoteResponse(BaseModel):
     video_filename: Optional[str] = None
 
 
+class StoredQuoteResponse(QuoteResponse):
+    """A quote from the quote store, with engagement metrics"""
+    media_id: Optional[str] = None
+    likes: int = 0
+    shares: int = 0
+    comments: int = 0
+    saves: int = 0
+    reach: int = 0
+    engagement_score: float = 0.0
+
+
+class EngagementUpdate(BaseModel):
+    """Latest engagement counters for a published quote"""
+    likes: int = Field(default=0, ge=0)
+    comments: int = Field(default=0, ge=0)
+    shares: int = Field(default=0, ge=0)
+    saves: int = Field(default=0, ge=0)
+    reach: int = Field(default=0, ge=0)
+
+
+class QuotePage(BaseModel):
+    """A page of stored quotes; pass next_cursor back as `cursor` for the next page"""
+    quotes: List[StoredQuoteResponse]
+    next_cursor: Optional[int] = None
+
+
+class SearchResponse(QuotePage):
+    """Response model for quote search"""
+    query: str
+
+
 class QuoteRequest(BaseModel):
     """Request model for generating quotes"""
     theme: str = Field(default="mixed", description="Theme for the quote")
@@ -40,6 +89,50 @@ class QuoteRequest(BaseModel):
     image: bool = Field(default=False, description="Whether to generate an image")
     image_style: str = Field(default="paper", description="Image style: paper, modern, minimal")
     video: bool = Field(default=False, description="Whether to generate a video (requires image=true)")
+    deterministic: bool = Field(default=False, description="Reproducible quote (temperature 0, fixed seed), served from the response cache")
+    force: bool = Field(default=False, description="Regenerate image/video even if identical inputs are cached")
+
+
+class BatchQuoteRequest(BaseModel):
+    """Request model for generating several quotes at once"""
+    count: int = Field(default=7, ge=1, le=BATCH_MAX_QUOTES, description="Number of quotes to generate")
+    theme: str = Field(default="mixed", description="Theme for the quotes")
+    target_audience: str = Field(default="gen-z", description="Target audience")
+    format_preference: Optional[str] = Field(default=None, description="Preferred format")
+
+
+class BatchQuoteResponse(BaseModel):
+    """Response model for batch quote generation"""
+    requested: int
+    generated: int
+    quotes: List[QuoteResponse]
+    error: Optional[str] = None
+
+
+class BatchPostSpec(BaseModel):
+    """One post to produce in a batch pipeline run"""
+    theme: str = Field(default="mixed", description="Theme for the quote")
+    target_audience: str = Field(default="gen-z", description="Target audience")
+    format_preference: Optional[str] = Field(default=None, description="Preferred format")
+    image: bool = Field(default=True, description="Whether to generate an image")
+    image_style: str = Field(default="paper", description="Image style: paper, modern, minimal")
+    video: bool = Field(default=True, description="Whether to generate a video (implies image)")
+    force: bool = Field(default=False, description="Regenerate image/video even if identical inputs are cached")
+
+
+class BatchPipelineRequest(BaseModel):
+    """Request model for the batch post pipeline"""
+    items: List[BatchPostSpec] = Field(min_length=1, max_length=PIPELINE_MAX_ITEMS, description="Posts to produce")
+
+
+class BatchPipelineItem(BaseModel):
+    """A finished (or failed) item streamed by the batch post pipeline"""
+    index: int
+    success: bool
+    quote: Optional[QuoteResponse] = None
+    stage: Optional[str] = None
+    error: Optional[str] = None
+
 
 class ReelUploadRequest(BaseModel):
     video_url: HttpUrl
@@ -64,3 +157,23 @@ class StatusResponse(BaseModel):
     success: bool
     status: str
     message: str
+
+
+class JobSubmitResponse(BaseModel):
+    """Response returned when a background job is queued"""
+    job_id: str
+    status: str
+    message: str
+
+
+class JobStatusResponse(BaseModel):
+    """Current state of a background job"""
+    job_id: str
+    kind: str
+    status: str
+    stage: Optional[str] = None
+    progress: float = 0.0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
\ No newline at end of file
@@ -3,21 +3,31 @@
 Quote generator service using LangChain and OpenAI
 """
 
-import json
+import asyncio
 import random
 import time
 from datetime import datetime
-from typing import Optional
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 
-from models import Quote
+from llm_json import JsonFieldStream, extract_json, parse_model
+from llm_cache import cache_key, get_llm_cache
+from llm_metrics import llm_metrics
+from models import Quote, QuoteDraft, QuoteDraftBatch
 from config import (
-    OPENAI_API_BASE, OPENAI_API_KEY, MODEL_NAME, TEMPERATURE,
-    TITLE_PATTERNS, CONTENT_THEMES, QUOTE_GENERATOR_PROMPT,
-    CAPTION_TEMPLATES, MOTIVATIONAL_HASHTAGS
+    OPENAI_API_BASE, OPENAI_API_KEY, MODEL_NAME, TEMPERATURE, LLM_JSON_MODE, LLM_JSON_MAX_RETRIES,
+    TITLE_PATTERNS, CONTENT_THEMES, QUOTE_GENERATOR_PROMPT, QUOTE_OUTPUT_RULES, BATCH_OUTPUT_RULES,
+    CAPTION_TEMPLATES, MOTIVATIONAL_HASHTAGS,
+    BATCH_CHUNK_SIZE, BATCH_MAX_ROUNDS, DEDUP_ENABLED, DEDUP_MAX_RETRIES, LLM_DETERMINISTIC_SEED,
+    QUOTE_POOL_ENABLED
 )
+from dedup_index import get_dedup_index
+from quote_pool import QuotePool
+from quote_store import get_quote_store
+from trending_index import TrendingIndex
 from image_generator import QuoteImageGenerator
 from video_generator import QuoteVideoGenerator
 
@@ -30,14 +40,27 @@ class ViralQuoteGenerator:
             openai_api_base=OPENAI_API_BASE,
             openai_api_key=OPENAI_API_KEY,
             model=MODEL_NAME,
-            temperature=TEMPERATURE
+            temperature=TEMPERATURE,
+            stream_usage=True
         )
+        # JSON mode makes the API reject non-JSON completions instead of us parsing prose
+        self.json_llm = self.llm.bind(response_format={"type": "json_object"}) if LLM_JSON_MODE else self.llm
+        self.deterministic_llm = self.json_llm.bind(temperature=0, seed=LLM_DETERMINISTIC_SEED)
         self.image_generator = QuoteImageGenerator()
         self.video_generator = QuoteVideoGenerator()
+        self.store = get_quote_store()
+        self.trending = TrendingIndex(self.store.engagement_ranking)
+        # Pooled results are only checked against the dedup index; they are recorded when served
+        self.pool = QuotePool(partial(self._agenerate_ai_quotes, record=False)) if QUOTE_POOL_ENABLED else None
+        # Identical across calls so the provider can serve them from its prompt prefix cache
+        self._quote_system_message = SystemMessage(content=f"{QUOTE_GENERATOR_PROMPT}\n\n{QUOTE_OUTPUT_RULES}")
+        self._batch_system_message = SystemMessage(content=f"{QUOTE_GENERATOR_PROMPT}\n\n{BATCH_OUTPUT_RULES}")
         
-    def _generate_ai_quote(self, theme: str = "mixed", target_audience: str = "gen-z", 
-                          format_preference: Optional[str] = None) -> dict:
-        """Generate quote using AI with variety"""
+    def _build_quote_messages(self, theme: str = "mixed", target_audience: str = "gen-z",
+                              format_preference: Optional[str] = None,
+                              rng: Optional[random.Random] = None) -> list:
+        """Build the chat messages for a single quote generation with variety (reproducible when rng is given)"""
+        choice = rng.choice if rng else random.choice
         variety_phrases = [
             "Create a completely unique and fresh perspective that hasn't been seen before",
             "Generate something that feels authentic and personally relatable", 
@@ -48,84 +71,287 @@ class ViralQuoteGenerator:
             "Generate fresh content that feels like a personal revelation"
         ]
         
-        variety_instruction = random.choice(variety_phrases)
+        variety_instruction = choice(variety_phrases)
         
         # Add randomness to title selection
         if format_preference and format_preference != "string":
             suggested_title = format_preference
         else:
-            suggested_title = random.choice(TITLE_PATTERNS)
+            suggested_title = choice(TITLE_PATTERNS)
         
         # Add randomness to theme content
         if theme and theme != "mixed":
             if theme in CONTENT_THEMES:
-                content_inspiration = random.choice(CONTENT_THEMES[theme])
+                content_inspiration = choice(CONTENT_THEMES[theme])
                 theme_instruction = f"\nTheme focus: '{theme}' - consider ideas like: {content_inspiration}"
             else:
                 theme_instruction = f"\nTheme focus: '{theme}'"
         else:
             themes = list(CONTENT_THEMES.keys())
-            chosen_theme = random.choice(themes)
-            content_inspiration = random.choice(CONTENT_THEMES[chosen_theme])
+            chosen_theme = choice(themes)
+            content_inspiration = choice(CONTENT_THEMES[chosen_theme])
             theme_instruction = f"\nTheme focus: '{chosen_theme}' - consider ideas like: {content_inspiration}"
         
         # Add timestamp for uniqueness
-        timestamp_variety = int(time.time()) % 1000
+        timestamp_variety = LLM_DETERMINISTIC_SEED if rng else int(time.time()) % 1000
         
-        # Construct the prompt with more variety
-        user_prompt = f"""Generate ONE completely unique viral motivational quote in JSON format. {variety_instruction}.
+        # Only the per-request details vary; the fixed rules live in the system message
+        user_prompt = f"""Generate ONE completely unique viral motivational quote. {variety_instruction}.
 
 IMPORTANT: Use a catchy title (3-4 words) similar to: "{suggested_title}"
 {theme_instruction}
 
 Target audience: {target_audience}
-Uniqueness seed: {timestamp_variety}
-
-Requirements:
-- Respond with valid JSON only (title and content fields)
-- Make it 100% unique and original (never repeat previous content)
-- Use authentic {target_audience} language
-- Ensure it's shareable and screenshot-worthy
-- Provide genuine wisdom and fresh insight
-- Keep content under 25 words
-- Make title exactly 3-4 words (catchy and memorable)
-- Ensure content complements the title perfectly"""
+Uniqueness seed: {timestamp_variety}"""
 
-        messages = [
-            SystemMessage(content=QUOTE_GENERATOR_PROMPT),
+        return [
+            self._quote_system_message,
             HumanMessage(content=user_prompt)
         ]
-        
+    
+    def _parse_ai_response(self, response_content: str, theme: str, target_audience: str) -> dict:
+        """Parse and validate the raw LLM response into a quote result dict"""
         try:
-            response = self.llm.invoke(messages)
-            response_content = response.content.strip()
-            
-            # Clean response if needed
-            if response_content.startswith('```json'):
-                response_content = response_content.replace('```json', '').replace('```', '').strip()
-            
-            # Parse JSON
-            quote_data = json.loads(response_content)
-            
-            return {
-                "success": True,
-                "title": quote_data.get("title", ""),
-                "content": quote_data.get("content", ""),
-                "theme": theme,
-                "target_audience": target_audience
-            }
-            
-        except json.JSONDecodeError as e:
+            draft = parse_model(response_content, QuoteDraft)
+        except ValueError as e:
             return {
                 "success": False,
-                "error": f"JSON parsing error: {str(e)}",
-                "raw_response": response_content if 'response_content' in locals() else "No response"
+                "error": f"Invalid model output: {str(e)}",
+                "raw_response": response_content
             }
+        
+        return {
+            "success": True,
+            "title": draft.title,
+            "content": draft.content,
+            "theme": theme,
+            "target_audience": target_audience
+        }
+    
+    def _generate_ai_quote(self, theme: str = "mixed", target_audience: str = "gen-z", 
+                          format_preference: Optional[str] = None) -> dict:
+        """Generate quote using AI with variety, re-asking when the output is malformed"""
+        messages = self._build_quote_messages(theme, target_audience, format_preference)
+        
+        for attempt in range(LLM_JSON_MAX_RETRIES + 1):
+            try:
+                response = self.json_llm.invoke(messages)
+                llm_metrics.record("quote", response)
+            except Exception as e:
+                # Transport errors are already retried by the client
+                return {
+                    "success": False,
+                    "error": f"Generation error: {str(e)}"
+                }
+            ai_result = self._parse_ai_response(response.content, theme, target_audience)
+            if ai_result["success"]:
+                break
+            print(f"⚠️ Malformed quote output (attempt {attempt + 1}): {ai_result['error']}")
+        return ai_result
+    
+    async def _agenerate_ai_quote(self, theme: str = "mixed", target_audience: str = "gen-z", 
+                                 format_preference: Optional[str] = None) -> dict:
+        """Async version of _generate_ai_quote that does not block the event loop"""
+        messages = self._build_quote_messages(theme, target_audience, format_preference)
+        
+        for attempt in range(LLM_JSON_MAX_RETRIES + 1):
+            try:
+                response = await self.json_llm.ainvoke(messages)
+                llm_metrics.record("quote", response)
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": f"Generation error: {str(e)}"
+                }
+            ai_result = self._parse_ai_response(response.content, theme, target_audience)
+            if ai_result["success"]:
+                break
+            print(f"⚠️ Malformed quote output (attempt {attempt + 1}): {ai_result['error']}")
+        return ai_result
+
+    def _deterministic_request(self, theme: str, target_audience: str,
+                               format_preference: Optional[str]) -> tuple:
+        """Cache key and reproducible messages for a deterministic request"""
+        # The system prompt is part of the key so prompt edits do not serve stale responses
+        key = cache_key(model=MODEL_NAME, seed=LLM_DETERMINISTIC_SEED, prompt=self._quote_system_message.content,
+                        theme=theme, target_audience=target_audience, format_preference=format_preference)
+        messages = self._build_quote_messages(theme, target_audience, format_preference, rng=random.Random(key))
+        return key, messages
+    
+    async def _agenerate_deterministic_ai_quote(self, theme: str, target_audience: str,
+                                                format_preference: Optional[str]) -> Tuple[dict, str, bool]:
+        """
+        Reproducible AI result (temperature 0, fixed seed), served from the response cache when possible
+        
+        Returns:
+            (ai_result, cache key, whether the response came from the cache)
+        """
+        loop = asyncio.get_running_loop()
+        key, messages = self._deterministic_request(theme, target_audience, format_preference)
+        
+        cached = await loop.run_in_executor(None, get_llm_cache().get, key)
+        if cached is not None:
+            return self._parse_ai_response(cached, theme, target_audience), key, True
+        
+        try:
+            response = await self.deterministic_llm.ainvoke(messages)
+            llm_metrics.record("deterministic", response)
         except Exception as e:
             return {
                 "success": False,
                 "error": f"Generation error: {str(e)}"
-            }
+            }, key, False
+        ai_result = self._parse_ai_response(response.content, theme, target_audience)
+        if ai_result["success"]:
+            await loop.run_in_executor(None, get_llm_cache().put, key, response.content)
+        return ai_result, key, False
+    
+    def _build_batch_messages(self, count: int, theme: str = "mixed", target_audience: str = "gen-z",
+                              format_preference: Optional[str] = None) -> list:
+        """Build the chat messages asking for `count` distinct quotes in one call"""
+        # Suggest a different title pattern per quote so the batch stays varied
+        if format_preference and format_preference != "string":
+            title_instruction = f'Use catchy titles (3-4 words) in the style of: "{format_preference}"'
+        else:
+            suggestions = random.sample(TITLE_PATTERNS, min(count, len(TITLE_PATTERNS)))
+            title_instruction = "Use a DIFFERENT catchy title (3-4 words) for each quote, inspired by: " + \
+                ", ".join(f'"{title}"' for title in suggestions)
+        
+        if theme and theme != "mixed":
+            if theme in CONTENT_THEMES:
+                ideas = "; ".join(random.sample(CONTENT_THEMES[theme], min(3, len(CONTENT_THEMES[theme]))))
+                theme_instruction = f"Theme focus: '{theme}' - consider ideas like: {ideas}"
+            else:
+                theme_instruction = f"Theme focus: '{theme}'"
+        else:
+            themes = random.sample(list(CONTENT_THEMES.keys()), min(count, len(CONTENT_THEMES)))
+            theme_instruction = "Mix these themes across the quotes: " + ", ".join(themes)
+        
+        timestamp_variety = int(time.time()) % 1000
+        
+        user_prompt = f"""Generate {count} completely unique viral motivational quotes.
+
+{title_instruction}
+{theme_instruction}
+
+Target audience: {target_audience}
+Uniqueness seed: {timestamp_variety}"""
+
+        return [
+            self._batch_system_message,
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _parse_ai_batch_response(self, response_content: str, theme: str, target_audience: str) -> List[dict]:
+        """Parse a batch of quotes from the LLM, keeping only entries that match the schema"""
+        try:
+            data = extract_json(response_content)
+        except ValueError:
+            return []
+        
+        # Accept {"quotes": [...]}, a bare array or a single quote object
+        if isinstance(data, list):
+            items = data
+        elif isinstance(data, dict) and "quotes" in data:
+            try:
+                items = QuoteDraftBatch.model_validate(data).quotes
+            except ValueError:
+                return []
+        else:
+            items = [data]
+        
+        results = []
+        for item in items:
+            try:
+                draft = QuoteDraft.model_validate(item)
+            except ValueError:
+                continue
+            results.append({
+                "success": True,
+                "title": draft.title,
+                "content": draft.content,
+                "theme": theme,
+                "target_audience": target_audience
+            })
+        
+        return results
+    
+    def _collect_batch_results(self, results: List[dict], new_results: List[dict], count: int,
+                               record: bool = True) -> None:
+        """Append new results that are not duplicates of ones already collected or generated before"""
+        seen = {result["content"].lower() for result in results}
+        for result in new_results:
+            key = result["content"].lower()
+            if key not in seen and len(results) < count and self._is_new_quote(result, record):
+                seen.add(key)
+                results.append(result)
+    
+    def _batch_chunks(self, remaining: int) -> List[int]:
+        """Split the remaining quote count into per-call chunk sizes"""
+        return [min(BATCH_CHUNK_SIZE, remaining - start) for start in range(0, remaining, BATCH_CHUNK_SIZE)]
+    
+    def generate_quotes(self, count: int, theme: str = "mixed", target_audience: str = "gen-z",
+                        format_preference: Optional[str] = None) -> List[Quote]:
+        """Generate `count` distinct quotes with one LLM call per BATCH_CHUNK_SIZE quotes"""
+        results: List[dict] = []
+        
+        for _ in range(BATCH_MAX_ROUNDS):
+            remaining = count - len(results)
+            if remaining <= 0:
+                break
+            for chunk in self._batch_chunks(remaining):
+                messages = self._build_batch_messages(chunk, theme, target_audience, format_preference)
+                try:
+                    response = self.json_llm.invoke(messages)
+                    llm_metrics.record("batch", response)
+                except Exception as e:
+                    print(f"❌ Batch generation error: {str(e)}")
+                    continue
+                self._collect_batch_results(
+                    results, self._parse_ai_batch_response(response.content, theme, target_audience), count
+                )
+        
+        return self._build_quotes(results, theme, target_audience)
+    
+    async def agenerate_quotes(self, count: int, theme: str = "mixed", target_audience: str = "gen-z",
+                               format_preference: Optional[str] = None) -> List[Quote]:
+        """Async version of generate_quotes; the chunk calls of each round run concurrently"""
+        results = await self._agenerate_ai_quotes(count, theme, target_audience, format_preference)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._build_quotes, results, theme, target_audience
+        )
+    
+    async def _agenerate_ai_quotes(self, count: int, theme: str = "mixed", target_audience: str = "gen-z",
+                                   format_preference: Optional[str] = None, record: bool = True) -> List[dict]:
+        """
+        Up to `count` distinct, dedup-checked AI results from concurrent batch calls
+        
+        With record=False the results are checked against the dedup index but not added
+        to it (for results that may never be served, like pre-generated pool entries).
+        """
+        results: List[dict] = []
+        loop = asyncio.get_running_loop()
+        
+        for _ in range(BATCH_MAX_ROUNDS):
+            remaining = count - len(results)
+            if remaining <= 0:
+                break
+            responses = await asyncio.gather(*[
+                self.json_llm.ainvoke(self._build_batch_messages(chunk, theme, target_audience, format_preference))
+                for chunk in self._batch_chunks(remaining)
+            ], return_exceptions=True)
+            for response in responses:
+                if isinstance(response, Exception):
+                    print(f"❌ Batch generation error: {str(response)}")
+                    continue
+                llm_metrics.record("batch", response)
+                # The dedup index writes to SQLite: keep it off the event loop
+                await loop.run_in_executor(
+                    None, self._collect_batch_results,
+                    results, self._parse_ai_batch_response(response.content, theme, target_audience), count, record
+                )
+        
+        return results
 
     def _generate_caption(self, quote_title: str) -> str:
         """Generate social media caption with hashtags"""
@@ -144,11 +370,9 @@ Requirements:
         
         return full_caption
 
-    def generate_quote(self, theme: str = "mixed", target_audience: str = "gen-z", 
-                      format_preference: Optional[str] = None) -> Quote:
-        """Generate a viral quote using AI"""
-        ai_result = self._generate_ai_quote(theme, target_audience, format_preference)
-        
+    def _build_quote(self, ai_result: dict, theme: str, target_audience: str,
+                     cache_key: Optional[str] = None) -> Quote:
+        """Turn an AI result dict into a stored Quote, with a fallback quote on error"""
         if ai_result["success"]:
             # Generate caption with hashtags
             caption = self._generate_caption(ai_result["title"])
@@ -161,6 +385,8 @@ Requirements:
                 created_at=datetime.now().isoformat(),
                 caption=caption
             )
+            quote.id = self.store.add(quote, cache_key=cache_key)
+            self.trending.add(quote.id, quote.theme)
             return quote
         else:
             # Return fallback quote on error
@@ -170,43 +396,245 @@ Requirements:
                 theme=theme,
                 target_audience=target_audience,
                 created_at=datetime.now().isoformat(),
-                caption="Follow for more content! #motivation #quotes #inspiration"
+                caption="Follow for more content! #motivation #quotes #inspiration",
+                error=ai_result.get("error", "Unknown error")
+            )
+    
+    def _build_quotes(self, ai_results: List[dict], theme: str, target_audience: str) -> List[Quote]:
+        return [self._build_quote(ai_result, theme, target_audience) for ai_result in ai_results]
+    
+    async def _abuild_quote(self, ai_result: dict, theme: str, target_audience: str,
+                            cache_key: Optional[str] = None) -> Quote:
+        """_build_quote on a worker thread (it writes to the quote store)"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._build_quote, ai_result, theme, target_audience, cache_key
+        )
+    
+    def _stored_deterministic_quote(self, cache_key: str) -> Optional[Quote]:
+        """The quote already stored for a deterministic request, if any"""
+        row = self.store.get_by_cache_key(cache_key)
+        if row is None:
+            return None
+        return Quote(
+            id=row["id"],
+            title=row["title"],
+            content=row["content"],
+            theme=row["theme"],
+            target_audience=row["target_audience"],
+            created_at=row["created_at"],
+            caption=row["caption"]
+        )
+
+    def save_media(self, quote: Quote, **urls) -> None:
+        """Record generated media URLs (image_url, video_url) for a stored quote"""
+        urls = {name: url for name, url in urls.items() if url}
+        if quote.id is not None and urls:
+            self.store.update(quote.id, **urls)
+    
+    async def asave_media(self, quote: Quote, **urls) -> None:
+        """save_media on a worker thread"""
+        await asyncio.get_running_loop().run_in_executor(None, partial(self.save_media, quote, **urls))
+    
+    def _is_new_quote(self, ai_result: dict, record: bool = True) -> bool:
+        """Check a successful result against the dedup index and add it unless record is False; False for a near-duplicate"""
+        if not DEDUP_ENABLED or not ai_result["success"]:
+            return True
+        if record:
+            is_new = get_dedup_index().add_if_new(ai_result["content"])
+        else:
+            is_new = get_dedup_index().find_duplicate(ai_result["content"]) is None
+        if is_new:
+            return True
+        print(f"♻️ Rejected near-duplicate quote: {ai_result['content']}")
+        return False
+    
+    def _warn_duplicate_accepted(self, ai_result: dict, regenerations: int = DEDUP_MAX_RETRIES) -> None:
+        print(f"⚠️ Accepting near-duplicate quote after {regenerations} regenerations: {ai_result['content']}")
+    
+    def generate_quote(self, theme: str = "mixed", target_audience: str = "gen-z", 
+                      format_preference: Optional[str] = None) -> Quote:
+        """Generate a viral quote using AI, regenerating near-duplicates of earlier quotes"""
+        for _ in range(DEDUP_MAX_RETRIES + 1):
+            ai_result = self._generate_ai_quote(theme, target_audience, format_preference)
+            if self._is_new_quote(ai_result):
+                break
+        else:
+            self._warn_duplicate_accepted(ai_result)
+        return self._build_quote(ai_result, theme, target_audience)
+    
+    async def agenerate_quote(self, theme: str = "mixed", target_audience: str = "gen-z", 
+                             format_preference: Optional[str] = None, deterministic: bool = False) -> Quote:
+        """Generate a viral quote using AI without blocking the event loop"""
+        if deterministic:
+            # Reproducing content on purpose: skip the pool and the near-duplicate check
+            ai_result, key, cached = await self._agenerate_deterministic_ai_quote(
+                theme, target_audience, format_preference
             )
+            if cached:
+                # Replays reuse the stored quote instead of inserting another copy under a new id
+                quote = await asyncio.get_running_loop().run_in_executor(None, self._stored_deterministic_quote, key)
+                if quote is not None:
+                    return quote
+            return await self._abuild_quote(ai_result, theme, target_audience, cache_key=key)
+        
+        loop = asyncio.get_running_loop()
+        if self.pool is not None and format_preference is None:
+            # Pooled results are recorded in the dedup index when served; skip any that
+            # a quote served since the pool was filled has made a near-duplicate
+            while True:
+                ai_result = self.pool.take(theme, target_audience)
+                if ai_result is None:
+                    break
+                if await loop.run_in_executor(None, self._is_new_quote, ai_result):
+                    return await self._abuild_quote(ai_result, theme, target_audience)
+        
+        for _ in range(DEDUP_MAX_RETRIES + 1):
+            ai_result = await self._agenerate_ai_quote(theme, target_audience, format_preference)
+            if await loop.run_in_executor(None, self._is_new_quote, ai_result):
+                break
+        else:
+            self._warn_duplicate_accepted(ai_result)
+        return await self._abuild_quote(ai_result, theme, target_audience)
+    
+    async def astream_quote(self, theme: str = "mixed", target_audience: str = "gen-z",
+                            format_preference: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a quote while streaming the model's tokens
+        
+        Yields events as dicts:
+        - {"type": "title", "title": ...} as soon as the title is complete
+        - {"type": "token", "field": "content", "text": ...} for each content delta
+        - {"type": "quote", "quote": Quote} once the response is validated and stored
+        - {"type": "error", "error": ...} if generation failed
+        
+        Tokens already sent cannot be taken back, so malformed output is not retried
+        and near-duplicates are recorded but not regenerated.
+        """
+        messages = self._build_quote_messages(theme, target_audience, format_preference)
+        fields = JsonFieldStream()
+        chunks: List[str] = []
+        
+        try:
+            async for chunk in self.json_llm.astream(messages):
+                # Usage arrives on the final chunk
+                if chunk.usage_metadata:
+                    llm_metrics.record("stream", chunk)
+                text = chunk.content
+                if not text:
+                    continue
+                chunks.append(text)
+                for field, value, done in fields.feed(text):
+                    if field == "title" and done:
+                        yield {"type": "title", "title": value.strip()}
+                    elif field == "content" and not done:
+                        yield {"type": "token", "field": field, "text": value}
+        except Exception as e:
+            yield {"type": "error", "error": f"Generation error: {str(e)}"}
+            return
+        
+        ai_result = self._parse_ai_response("".join(chunks), theme, target_audience)
+        if not ai_result["success"]:
+            yield {"type": "error", "error": ai_result["error"]}
+            return
+        
+        if not await asyncio.get_running_loop().run_in_executor(None, self._is_new_quote, ai_result):
+            self._warn_duplicate_accepted(ai_result, regenerations=0)
+        yield {"type": "quote", "quote": await self._abuild_quote(ai_result, theme, target_audience)}
     
     def generate_quote_with_image(self, theme: str = "mixed", target_audience: str = "gen-z", 
                                  format_preference: Optional[str] = None, 
-                                 image_style: str = "paper") -> tuple:
+                                 image_style: str = "paper", force: bool = False) -> tuple:
         """Generate a viral quote with optional image"""
         # First generate the quote
         quote = self.generate_quote(theme, target_audience, format_preference)
         
         # If quote generation failed, return quote with no image
-        if quote.title == "Error occurred":
-            return quote, None, None, quote.content
+        if quote.error:
+            return quote, None, None, quote.error
         
         # Generate image for the quote content only (without title)
         filename, blob_url, error = self.image_generator.generate_quote_image_safe(
-            quote.content, image_style  # Only pass the content, not the title
+            quote.content, image_style, force  # Only pass the content, not the title
         )
+        self.save_media(quote, image_url=blob_url)
         
         return quote, filename, blob_url, error
     
+    async def agenerate_quote_with_image(self, theme: str = "mixed", target_audience: str = "gen-z", 
+                                        format_preference: Optional[str] = None, 
+                                        image_style: str = "paper",
+                                        progress: Optional[Callable[[str, float], None]] = None,
+                                        deterministic: bool = False, force: bool = False) -> tuple:
+        """Generate a viral quote with optional image without blocking the event loop"""
+        quote, filename, blob_url, _, error = await self._agenerate_quote_with_image_bytes(
+            theme, target_audience, format_preference, image_style, progress, deterministic, force
+        )
+        return quote, filename, blob_url, error
+    
+    async def _agenerate_quote_with_image_bytes(self, theme: str, target_audience: str,
+                                                format_preference: Optional[str], image_style: str,
+                                                progress: Optional[Callable[[str, float], None]],
+                                                deterministic: bool = False, force: bool = False) -> tuple:
+        """Generate a quote and its image, returning (quote, filename, blob_url, image_bytes, error)"""
+        # First generate the quote
+        if progress:
+            progress("quote", 0.0)
+        quote = await self.agenerate_quote(theme, target_audience, format_preference, deterministic)
+        
+        # If quote generation failed, return quote with no image
+        if quote.error:
+            return quote, None, None, None, quote.error
+        
+        # Generate image for the quote content only (without title)
+        if progress:
+            progress("image", 0.2)
+        filename, blob_url, image_bytes, error = await self.image_generator.agenerate_quote_image_with_bytes_safe(
+            quote.content, image_style, force  # Only pass the content, not the title
+        )
+        await self.asave_media(quote, image_url=blob_url)
+        
+        return quote, filename, blob_url, image_bytes, error
+    
     async def generate_quote_with_video(self, theme: str = "mixed", target_audience: str = "gen-z", 
                                  format_preference: Optional[str] = None, 
-                                 image_style: str = "paper") -> tuple:
+                                 image_style: str = "paper",
+                                 progress: Optional[Callable[[str, float], None]] = None,
+                                 deterministic: bool = False, force: bool = False) -> tuple:
         """Generate a viral quote with image and video"""
         # First generate quote with image
-        quote, image_filename, image_blob_url, image_error = self.generate_quote_with_image(
-            theme, target_audience, format_preference, image_style
+        (quote, image_filename, image_blob_url, 
+         image_bytes, image_error) = await self._agenerate_quote_with_image_bytes(
+            theme, target_audience, format_preference, image_style, progress, deterministic, force
         )
         
         # If image generation failed, return with no video
         if image_error or not image_blob_url:
             return quote, image_filename, image_blob_url, None, None, image_error
         
-        # Generate video using the image and AI-generated quote title
+        # Generate video from the in-memory image (the URL is only kept for the response)
         video_filename, video_blob_url, video_error = await self.video_generator.generate_quote_video_safe(
-            image_blob_url, quote.title  # Use the AI-generated title from the quote
+            image_blob_url, quote.title,  # Use the AI-generated title from the quote
+            progress=progress,
+            image_bytes=image_bytes,
+            force=force
         )
+        await self.asave_media(quote, video_url=video_blob_url)
         
         return quote, image_filename, image_blob_url, video_filename, video_blob_url, video_error
+    
+    def search_quotes(self, query: str, theme: Optional[str] = None, target_audience: Optional[str] = None,
+                      since: Optional[str] = None, until: Optional[str] = None,
+                      limit: int = 10, cursor: Optional[int] = None) -> tuple:
+        """Full-text search over stored quotes; returns (quotes, next_cursor)"""
+        return self.store.search(query, theme, target_audience, since, until, limit, cursor)
+    
+    def get_quotes_by_theme(self, theme: str, limit: int = 10, cursor: Optional[int] = None,
+                            sort: str = "recent") -> tuple:
+        """Stored quotes for a theme, newest first or by engagement; returns (quotes, next_cursor)"""
+        if sort == "engagement":
+            return self.get_trending_quotes(limit, theme), None
+        return self.store.list(theme=theme, limit=limit, before_id=cursor)
+    
+    def get_trending_quotes(self, limit: int = 10, theme: Optional[str] = None) -> List[dict]:
+        """Stored quotes with the highest engagement score, read from the maintained ranking"""
+        return self.store.get_many(self.trending.top(limit, theme))
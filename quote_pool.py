@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Warm pool of pre-generated quotes per (theme, audience)
+
+Quotes are generated ahead of time in batches by a background task and handed
+out instantly; taking a quote below the low watermark triggers a refill up to
+the high watermark. Entries older than the TTL are discarded so served quotes
+stay fresh.
+
+Only the configured warm pairs are kept topped up in the background. Pools for
+other requested pairs are refilled only when taken from, dropped once nobody
+has taken from them for a TTL, and capped in number, so background generation
+does not grow with the variety of requests.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from config import (
+    QUOTE_POOL_LOW_WATERMARK, QUOTE_POOL_HIGH_WATERMARK, QUOTE_POOL_TTL,
+    QUOTE_POOL_WARM_THEMES, QUOTE_POOL_WARM_AUDIENCES, QUOTE_POOL_MAX_POOLS
+)
+
+
+# Filler signature: (count, theme, target_audience) -> validated AI result dicts
+PoolFiller = Callable[[int, str, str], Awaitable[List[dict]]]
+PoolKey = Tuple[str, str]
+
+
+class QuotePool:
+    """Pre-generated AI results per (theme, target_audience), refilled in the background"""
+
+    def __init__(self, filler: PoolFiller,
+                 low_watermark: int = QUOTE_POOL_LOW_WATERMARK,
+                 high_watermark: int = QUOTE_POOL_HIGH_WATERMARK,
+                 ttl: float = QUOTE_POOL_TTL, max_pools: int = QUOTE_POOL_MAX_POOLS):
+        self.filler = filler
+        self.low_watermark = low_watermark
+        self.high_watermark = max(high_watermark, low_watermark + 1)
+        self.ttl = ttl
+        self.max_pools = max(1, max_pools)
+        self._pools: Dict[PoolKey, Deque[Tuple[float, dict]]] = {}
+        self._warm: Set[PoolKey] = set()
+        self._last_taken: Dict[PoolKey, float] = {}
+        self._refilling: Set[PoolKey] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._maintenance: Optional[asyncio.Task] = None
+
+    def _evict_expired(self, pool: Deque[Tuple[float, dict]]) -> None:
+        cutoff = time.monotonic() - self.ttl
+        while pool and pool[0][0] < cutoff:
+            pool.popleft()
+
+    def take(self, theme: str, target_audience: str) -> Optional[dict]:
+        """
+        Pop a fresh pre-generated result, scheduling a refill when the pool runs low
+
+        Returns None when the pool is empty, or when it does not exist yet and there is
+        no room for another pool.
+        """
+        key = (theme, target_audience)
+        pool = self._pools.get(key)
+        if pool is None:
+            if not self._make_room():
+                return None
+            pool = self._pools[key] = deque()
+        self._last_taken[key] = time.monotonic()
+        self._evict_expired(pool)
+
+        result = pool.popleft()[1] if pool else None
+        if len(pool) < self.low_watermark:
+            self.schedule_refill(key)
+        return result
+
+    def _drop(self, key: PoolKey) -> None:
+        self._pools.pop(key, None)
+        self._last_taken.pop(key, None)
+
+    def _make_room(self) -> bool:
+        """Make space for one more pool, evicting the least recently taken on-demand pool"""
+        if len(self._pools) < self.max_pools:
+            return True
+        # Warm pools always stay
+        on_demand = [key for key in self._pools if key not in self._warm]
+        if not on_demand:
+            return False
+        self._drop(min(on_demand, key=lambda key: self._last_taken.get(key, 0.0)))
+        return True
+
+    def schedule_refill(self, key: PoolKey) -> None:
+        """Start a background refill for key unless one is already running"""
+        if key in self._refilling:
+            return
+        self._refilling.add(key)
+        task = asyncio.create_task(self._refill(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refill(self, key: PoolKey) -> None:
+        try:
+            pool = self._pools.get(key)
+            if pool is None:
+                return
+            self._evict_expired(pool)
+            missing = self.high_watermark - len(pool)
+            if missing <= 0:
+                return
+            results = await self.filler(missing, *key)
+            # The pool may have been dropped while the filler was running
+            pool = self._pools.get(key)
+            if pool is None:
+                return
+            now = time.monotonic()
+            pool.extend((now, result) for result in results)
+            print(f"🧺 Quote pool {key} refilled with {len(results)} quotes ({len(pool)} ready)")
+        except Exception as e:
+            print(f"⚠️ Quote pool refill failed for {key}: {str(e)}")
+        finally:
+            self._refilling.discard(key)
+
+    async def _maintain(self) -> None:
+        # Expired entries of warm pools are replaced before requests find them empty;
+        # on-demand pools are only refilled by take() and dropped once idle for a TTL
+        while True:
+            idle_cutoff = time.monotonic() - self.ttl
+            for key, pool in list(self._pools.items()):
+                self._evict_expired(pool)
+                if key in self._warm:
+                    if len(pool) < self.low_watermark:
+                        self.schedule_refill(key)
+                elif self._last_taken.get(key, 0.0) < idle_cutoff and key not in self._refilling:
+                    self._drop(key)
+            await asyncio.sleep(max(1.0, self.ttl / 4))
+
+    def start(self) -> None:
+        """Warm the configured pools and start background maintenance"""
+        if self._maintenance is not None:
+            return
+        for theme in QUOTE_POOL_WARM_THEMES:
+            for target_audience in QUOTE_POOL_WARM_AUDIENCES:
+                self._warm.add((theme, target_audience))
+                self._pools.setdefault((theme, target_audience), deque())
+        self._maintenance = asyncio.create_task(self._maintain())
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks)
+        if self._maintenance is not None:
+            tasks.append(self._maintenance)
+            self._maintenance = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Ready quotes per pool"""
+        return {f"{theme}/{audience}": len(pool) for (theme, audience), pool in self._pools.items()}
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Persistent quote repository (SQLite + FTS5)
+
+Every generated quote is stored with its theme, audience, media URLs and
+engagement counters. Listings use keyset pagination on the quote ID (newest
+first), so deep pages cost the same as the first one.
+"""
+
+import os
+import sqlite3
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import QUOTES_DB_PATH
+from models import Quote
+
+
+def engagement_score(likes: int, comments: int, shares: int, saves: int) -> float:
+    """Weighted interaction count; shares and saves signal more intent than likes"""
+    return float(likes + 2 * comments + 3 * shares + 3 * saves)
+
+
+class QuoteStore:
+    """SQLite persistence and indexed search for generated quotes"""
+
+    def __init__(self, db_path: str = QUOTES_DB_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS quotes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                theme TEXT NOT NULL,
+                target_audience TEXT NOT NULL,
+                caption TEXT NOT NULL DEFAULT '',
+                created_at TEXT NOT NULL,
+                image_url TEXT,
+                video_url TEXT,
+                media_id TEXT,
+                likes INTEGER NOT NULL DEFAULT 0,
+                shares INTEGER NOT NULL DEFAULT 0,
+                comments INTEGER NOT NULL DEFAULT 0,
+                saves INTEGER NOT NULL DEFAULT 0,
+                reach INTEGER NOT NULL DEFAULT 0,
+                engagement_score REAL NOT NULL DEFAULT 0,
+                insights_updated_at TEXT,
+                cache_key TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_quotes_theme ON quotes (theme, id);
+            CREATE INDEX IF NOT EXISTS idx_quotes_audience ON quotes (target_audience, id);
+            CREATE INDEX IF NOT EXISTS idx_quotes_created ON quotes (created_at);
+            CREATE INDEX IF NOT EXISTS idx_quotes_engagement ON quotes (engagement_score DESC, id);
+            CREATE INDEX IF NOT EXISTS idx_quotes_theme_engagement ON quotes (theme, engagement_score DESC, id);
+            CREATE INDEX IF NOT EXISTS idx_quotes_video_url ON quotes (video_url);
+            CREATE INDEX IF NOT EXISTS idx_quotes_media ON quotes (media_id);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS quotes_fts USING fts5(
+                title, content, content='quotes', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS quotes_fts_insert AFTER INSERT ON quotes BEGIN
+                INSERT INTO quotes_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS quotes_fts_delete AFTER DELETE ON quotes BEGIN
+                INSERT INTO quotes_fts (quotes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            END;
+        """)
+        self._add_missing_columns()
+        self._conn.commit()
+
+    def _add_missing_columns(self) -> None:
+        """Bring databases created before the engagement and cache key columns existed up to date"""
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(quotes)")}
+        for column, definition in (
+            ("comments", "INTEGER NOT NULL DEFAULT 0"),
+            ("saves", "INTEGER NOT NULL DEFAULT 0"),
+            ("reach", "INTEGER NOT NULL DEFAULT 0"),
+            ("insights_updated_at", "TEXT"),
+            ("cache_key", "TEXT"),
+        ):
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE quotes ADD COLUMN {column} {definition}")
+        # Created here so databases that only just gained the column get it too
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_quotes_cache_key ON quotes (cache_key)")
+
+    def _row_to_quote(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return dict(row)
+
+    def add(self, quote: Quote, image_url: Optional[str] = None, video_url: Optional[str] = None,
+            cache_key: Optional[str] = None) -> int:
+        """Store a quote and return its ID (cache_key links deterministic quotes to their cached response)"""
+        data = asdict(quote)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO quotes (title, content, theme, target_audience, caption, created_at, image_url, video_url, "
+                "cache_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (data["title"], data["content"], data["theme"], data["target_audience"],
+                 data["caption"], data["created_at"], image_url, video_url, cache_key)
+            )
+            self._conn.commit()
+        return cursor.lastrowid
+
+    def update(self, quote_id: int, **fields) -> None:
+        """Update stored columns (media URLs, media_id, engagement counters)"""
+        if not fields:
+            return
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE quotes SET {columns} WHERE id = ?", (*fields.values(), quote_id))
+            self._conn.commit()
+
+    def get(self, quote_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM quotes WHERE id = ?", (quote_id,)).fetchone()
+        return self._row_to_quote(row) if row else None
+
+    def get_by_cache_key(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Most recent quote stored for a deterministic request's cache key"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM quotes WHERE cache_key = ? ORDER BY id DESC LIMIT 1", (cache_key,)
+            ).fetchone()
+        return self._row_to_quote(row) if row else None
+
+    def _filters(self, theme: Optional[str], target_audience: Optional[str], since: Optional[str],
+                 until: Optional[str], before_id: Optional[int], table: str = "quotes") -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        if theme:
+            clauses.append(f"{table}.theme = ?")
+            params.append(theme)
+        if target_audience:
+            clauses.append(f"{table}.target_audience = ?")
+            params.append(target_audience)
+        if since:
+            clauses.append(f"{table}.created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append(f"{table}.created_at < ?")
+            params.append(until)
+        if before_id is not None:
+            clauses.append(f"{table}.id < ?")
+            params.append(before_id)
+        return clauses, params
+
+    def _fts_query(self, query: str) -> str:
+        """Turn free text into an FTS5 query matching all terms (prefix match on each)"""
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, query: str, theme: Optional[str] = None, target_audience: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None,
+               limit: int = 10, before_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Full-text search over titles and contents, newest first
+
+        Returns:
+            Tuple of (quotes, next_cursor); pass next_cursor as before_id for the next page
+        """
+        fts_query = self._fts_query(query)
+        if not fts_query:
+            return [], None
+
+        clauses, params = self._filters(theme, target_audience, since, until, before_id)
+        where = " AND ".join(["quotes_fts MATCH ?"] + clauses)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT quotes.* FROM quotes_fts JOIN quotes ON quotes.id = quotes_fts.rowid "
+                f"WHERE {where} ORDER BY quotes.id DESC LIMIT ?",
+                (fts_query, *params, limit + 1)
+            ).fetchall()
+        return self._page(rows, limit)
+
+    def list(self, theme: Optional[str] = None, target_audience: Optional[str] = None,
+             since: Optional[str] = None, until: Optional[str] = None,
+             limit: int = 10, before_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """List quotes newest first with optional filters and keyset pagination"""
+        clauses, params = self._filters(theme, target_audience, since, until, before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM quotes {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        return self._page(rows, limit)
+
+    def engagement_ranking(self, limit: int, theme: Optional[str] = None) -> List[Tuple[int, float]]:
+        """(id, engagement_score) pairs, highest score first; loads the trending index"""
+        with self._lock:
+            if theme:
+                rows = self._conn.execute(
+                    "SELECT id, engagement_score FROM quotes WHERE theme = ? ORDER BY engagement_score DESC, id LIMIT ?",
+                    (theme, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT id, engagement_score FROM quotes ORDER BY engagement_score DESC, id LIMIT ?", (limit,)
+                ).fetchall()
+        return [(row["id"], row["engagement_score"]) for row in rows]
+
+    def get_many(self, quote_ids: List[int]) -> List[Dict[str, Any]]:
+        """Fetch quotes by ID, in the order given"""
+        if not quote_ids:
+            return []
+        placeholders = ", ".join("?" for _ in quote_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM quotes WHERE id IN ({placeholders})", quote_ids
+            ).fetchall()
+        by_id = {row["id"]: self._row_to_quote(row) for row in rows}
+        return [by_id[quote_id] for quote_id in quote_ids if quote_id in by_id]
+
+    def link_media(self, video_url: str, media_id: str) -> Optional[Dict[str, Any]]:
+        """Attach a published Instagram media ID to the quote whose video was uploaded"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM quotes WHERE video_url = ? ORDER BY id DESC LIMIT 1", (video_url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE quotes SET media_id = ? WHERE id = ?", (media_id, row["id"]))
+            self._conn.commit()
+        return self._row_to_quote(row)
+
+    def published(self, limit: int, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Quotes published to Instagram, least recently refreshed first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM quotes WHERE media_id IS NOT NULL AND created_at >= ? "
+                "ORDER BY COALESCE(insights_updated_at, '') LIMIT ?",
+                (since or "", limit)
+            ).fetchall()
+        return [self._row_to_quote(row) for row in rows]
+
+    def update_engagement(self, quote_id: int, likes: int = 0, comments: int = 0, shares: int = 0,
+                          saves: int = 0, reach: int = 0) -> Optional[Tuple[str, float]]:
+        """
+        Store fresh engagement counters and recompute the engagement score
+
+        Returns:
+            Tuple of (theme, engagement_score), or None if the quote does not exist
+        """
+        score = engagement_score(likes, comments, shares, saves)
+        with self._lock:
+            row = self._conn.execute("SELECT theme FROM quotes WHERE id = ?", (quote_id,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE quotes SET likes = ?, comments = ?, shares = ?, saves = ?, reach = ?, "
+                "engagement_score = ?, insights_updated_at = ? WHERE id = ?",
+                (likes, comments, shares, saves, reach, score, datetime.now().isoformat(), quote_id)
+            )
+            self._conn.commit()
+        return row["theme"], score
+
+    def _page(self, rows: List[sqlite3.Row], limit: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        quotes = [self._row_to_quote(row) for row in rows[:limit]]
+        next_cursor = quotes[-1]["id"] if len(rows) > limit else None
+        return quotes, next_cursor
+
+
+_quote_store: Optional[QuoteStore] = None
+_quote_store_lock = threading.Lock()
+
+
+def get_quote_store() -> QuoteStore:
+    """Shared quote store, opened on first use"""
+    global _quote_store
+    with _quote_store_lock:
+        if _quote_store is None:
+            _quote_store = QuoteStore()
+        return _quote_store
+
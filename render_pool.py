@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Dedicated process pool for CPU-bound video rendering
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from config import (
+    RENDER_WORKERS, RENDER_MAX_PENDING, RENDER_QUEUE_TIMEOUT, RENDER_MP_START_METHOD
+)
+
+
+class RenderQueueFullError(Exception):
+    """Raised when no render slot frees up within the queue timeout"""
+
+
+class RenderPool:
+    """Process pool that runs one render per worker and bounds the number of queued renders"""
+
+    def __init__(self, workers: int = RENDER_WORKERS, max_pending: int = RENDER_MAX_PENDING,
+                 queue_timeout: float = RENDER_QUEUE_TIMEOUT):
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.active = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(RENDER_MP_START_METHOD)
+            )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # Running renders plus queued renders; anything beyond waits here (backpressure)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers + self.max_pending)
+        return self._slots
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run a picklable, module-level function in the render pool
+
+        Raises:
+            RenderQueueFullError: if the pool stays saturated for longer than queue_timeout
+        """
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise RenderQueueFullError(
+                f"Render queue is full ({self.workers} running, {self.max_pending} queued)"
+            )
+
+        self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.active -= 1
+            slots.release()
+
+    def stats(self) -> dict:
+        """Current pool utilisation"""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.active
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global render pool
+render_pool = RenderPool()
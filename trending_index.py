@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Maintained top-K ranking of quotes by engagement score
+
+Keeps a bounded, always-sorted list of the best quotes overall and per theme,
+updated on insert and on every engagement change, so /trending and
+/themes/{theme} rankings are O(k) reads instead of a sort over all quotes.
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import TRENDING_INDEX_SIZE
+
+
+# Loader signature: (limit, theme) -> [(quote_id, engagement_score)], best first
+RankingLoader = Callable[[int, Optional[str]], List[Tuple[int, float]]]
+
+_ALL = None  # ranking key for the global list
+
+
+class _Ranking:
+    """Bounded list of (-score, quote_id), kept sorted so the best entry is first"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries: List[Tuple[float, int]] = []
+        self.scores: Dict[int, float] = {}
+        self.complete = False  # True when every quote for this key fits in the list
+
+    def remove(self, quote_id: int) -> None:
+        score = self.scores.pop(quote_id, None)
+        if score is not None:
+            index = bisect.bisect_left(self.entries, (-score, quote_id))
+            del self.entries[index]
+
+    def offer(self, quote_id: int, score: float) -> None:
+        """Insert if the quote ranks within capacity (or the list is not full yet)"""
+        entry = (-score, quote_id)
+        if len(self.entries) >= self.capacity:
+            if entry >= self.entries[-1]:
+                self.complete = False
+                return
+            dropped = self.entries.pop()
+            del self.scores[dropped[1]]
+            self.complete = False
+        bisect.insort(self.entries, entry)
+        self.scores[quote_id] = score
+
+    def top(self, limit: int) -> List[int]:
+        return [quote_id for _, quote_id in self.entries[:limit]]
+
+
+class TrendingIndex:
+    """Top-K engagement rankings, overall and per theme"""
+
+    def __init__(self, loader: RankingLoader, capacity: int = TRENDING_INDEX_SIZE):
+        self.loader = loader
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._rankings: Dict[Optional[str], _Ranking] = {}
+
+    def _ranking(self, theme: Optional[str]) -> _Ranking:
+        """Get (loading from the store on first use) the ranking for a key"""
+        ranking = self._rankings.get(theme)
+        if ranking is None:
+            ranking = _Ranking(self.capacity)
+            self._fill(ranking, theme)
+            self._rankings[theme] = ranking
+        return ranking
+
+    def _fill(self, ranking: _Ranking, theme: Optional[str]) -> None:
+        ranking.entries.clear()
+        ranking.scores.clear()
+        rows = self.loader(self.capacity, theme)
+        for quote_id, score in rows:
+            ranking.offer(quote_id, score)
+        ranking.complete = len(rows) < self.capacity
+
+    def _refill_if_short(self, ranking: _Ranking, theme: Optional[str]) -> None:
+        # Entries dropped below capacity may hide quotes that were cut off earlier
+        if not ranking.complete and len(ranking.entries) < self.capacity // 2:
+            self._fill(ranking, theme)
+
+    def add(self, quote_id: int, theme: str, score: float = 0.0) -> None:
+        """Register a newly stored quote"""
+        with self._lock:
+            for key in (_ALL, theme):
+                ranking = self._rankings.get(key)
+                if ranking is not None:
+                    ranking.offer(quote_id, score)
+
+    def update(self, quote_id: int, theme: str, score: float) -> None:
+        """Reposition a quote after its engagement score changed"""
+        with self._lock:
+            for key in (_ALL, theme):
+                ranking = self._rankings.get(key)
+                if ranking is None:
+                    continue
+                ranking.remove(quote_id)
+                # Below the tail of a partial list, unseen quotes may outrank it: leave it out
+                if ranking.complete or not ranking.entries or (-score, quote_id) < ranking.entries[-1]:
+                    ranking.offer(quote_id, score)
+                self._refill_if_short(ranking, key)
+
+    def top(self, limit: int, theme: Optional[str] = None) -> List[int]:
+        """IDs of the `limit` highest-engagement quotes, best first"""
+        with self._lock:
+            ranking = self._ranking(theme)
+            if limit > len(ranking.entries) and not ranking.complete:
+                self._fill(ranking, theme)
+            return ranking.top(limit)
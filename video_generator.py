@@ -6,24 +6,285 @@ Video generation service using MoviePy and Azure Blob Storage
 import os
 import uuid
 import tempfile
+import subprocess
 import asyncio
+import threading
+from contextlib import nullcontext
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 from io import BytesIO
 
-from moviepy import AudioFileClip, ImageClip, TextClip, CompositeVideoClip, ColorClip
+import numpy as np
+from moviepy import ImageClip, TextClip, CompositeVideoClip, ColorClip
 from moviepy.video.fx.FadeIn import FadeIn
-from azure.storage.blob import BlobServiceClient
-import requests
-from PIL import Image, ImageDraw, ImageFont
+from moviepy.config import FFMPEG_BINARY
+from PIL import Image, ImageDraw
 import textwrap
 
 from config import (
     AZURE_STORAGE_CONNECTION_STRING, AZURE_CONTAINER_NAME, AZURE_VIDEO_FOLDER,
     DEFAULT_AUDIO_FILE, VIDEO_SIZE, VIDEO_TITLE, FADE_IN_DELAY, FADE_IN_DURATION,
     VIDEO_FPS, BACKGROUND_COLOR, BANNER_COLOR, BANNER_HEIGHT, BANNER_Y_POSITION,
-    TITLE_FONT_SIZE, TITLE_COLOR, WIDTH, HEIGHT
+    TITLE_FONT_SIZE, TITLE_COLOR, WIDTH, HEIGHT, RENDER_FFMPEG_THREADS,
+    VIDEO_FAST_RENDER, VIDEO_X264_PRESET, VIDEO_MEMORY_LIMIT, VIDEO_SCRATCH_DIR, VIDEO_PIPE_CHUNK_SIZE,
+    VIDEO_STREAM_UPLOAD, VIDEO_FRAGMENT_DURATION
 )
+from render_pool import render_pool
+from http_clients import get_async_client, get_blob_service_client
+from audio_cache import audio_cache
+from font_fitting import FONT_PATHS, fit_text, draw_centered
+from banner_cache import banner_cache, banner_key
+from asset_cache import asset_key, get_asset_cache
+from blob_upload import BlockBlobStream, get_blob_uploader
+
+
+@dataclass
+class RenderedVideo:
+    """
+    An encoded video, held in memory or, above VIDEO_MEMORY_LIMIT, in a scratch file;
+    uploaded is set when it was streamed to blob storage while encoding instead
+    """
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    size: int = 0
+    uploaded: bool = False
+    
+    def discard(self) -> None:
+        """Delete the scratch file, if any"""
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _load_scratch_output(path: str, memory_limit: int) -> RenderedVideo:
+    """Pull a finished scratch file into memory unless it is larger than memory_limit"""
+    size = os.path.getsize(path)
+    if size > memory_limit:
+        return RenderedVideo(path=path, size=size)
+    try:
+        with open(path, 'rb') as f:
+            return RenderedVideo(data=f.read(), size=size)
+    finally:
+        os.unlink(path)
+
+
+def _encode_to_scratch(command: List[str], frame: bytes) -> RenderedVideo:
+    """
+    Encode a regular MP4 with the moov atom up front (+faststart) into a scratch file
+    
+    faststart rewrites the file after encoding, so the output has to be seekable;
+    VIDEO_SCRATCH_DIR defaults to tmpfs, and the result is moved into memory when small.
+    """
+    output_path = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4', dir=VIDEO_SCRATCH_DIR).name
+    try:
+        result = subprocess.run(
+            command + ["-movflags", "+faststart", "-f", "mp4", output_path],
+            input=frame, capture_output=True
+        )
+        if result.returncode != 0:
+            raise Exception(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+        return _load_scratch_output(output_path, VIDEO_MEMORY_LIMIT)
+    except BaseException:
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+        raise
+
+
+def _encode_to_blob(command: List[str], frame: bytes, sink: BlockBlobStream) -> RenderedVideo:
+    """
+    Encode fragmented MP4 to stdout and stage it into a block-blob upload as it is produced
+    
+    The block list is only committed once ffmpeg has exited successfully.
+    """
+    process = subprocess.Popen(
+        command + [
+            "-movflags", "frag_keyframe+empty_moov+default_base_moof",
+            "-frag_duration", str(int(VIDEO_FRAGMENT_DURATION * 1_000_000)),
+            "-f", "mp4", "pipe:1"
+        ],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    
+    # Feed the frame from a thread so a full stdout pipe cannot deadlock the write
+    def feed_frame():
+        try:
+            process.stdin.write(frame)
+        except BrokenPipeError:
+            pass
+        finally:
+            process.stdin.close()
+    
+    feeder = threading.Thread(target=feed_frame, daemon=True)
+    feeder.start()
+    try:
+        for chunk in iter(lambda: process.stdout.read1(VIDEO_PIPE_CHUNK_SIZE), b""):
+            sink.write(chunk)
+    except BaseException:
+        process.kill()
+        sink.abort()
+        raise
+    finally:
+        feeder.join()
+        stderr = process.stderr.read()
+        process.wait()
+    
+    if process.returncode != 0:
+        sink.abort()
+        raise Exception(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+    
+    print("☁️ Committing streamed video blocks...")
+    sink.commit()
+    return RenderedVideo(size=sink.size, uploaded=True)
+
+
+def render_static_video_file(image_data: bytes, banner_frame: np.ndarray, audio_path: str,
+                             video_size: Tuple[int, int], fade_in_delay: float,
+                             fade_in_duration: float, upload_blob_path: Optional[str] = None) -> RenderedVideo:
+    """
+    Fast path for the standard template: background and banner never change and the
+    quote image only fades in once, so both layers are composed a single time with PIL
+    and ffmpeg loops them, applying the fade and overlay in its own filtergraph.
+    
+    Both layers go to ffmpeg as one raw RGB frame on stdin (base stacked above quote,
+    split again by crop filters). The output is a regular faststart MP4 written to the
+    scratch directory, or, with upload_blob_path, fragmented MP4 read from stdout and
+    staged to that blob block by block while the encoder is still running.
+    """
+    print("🔊 Loading cached audio track...")
+    audio_track, video_duration = audio_cache.get(audio_path)
+    print(f"⏱️ Video duration: {video_duration} seconds")
+    
+    # Static base frame: background + banner
+    print("🖼️ Precomposing static frames...")
+    base_frame = Image.new("RGB", video_size, BACKGROUND_COLOR)
+    banner = Image.fromarray(banner_frame)
+    base_frame.paste(banner, ((video_size[0] - banner.width) // 2, BANNER_Y_POSITION))
+    
+    # Quote layer scaled to the video width, as the composite path does
+    with Image.open(BytesIO(image_data)) as quote_image:
+        quote_image = quote_image.convert("RGB")
+        quote_height = round(quote_image.height * video_size[0] / quote_image.width)
+        quote_frame = quote_image.resize((video_size[0], quote_height), Image.LANCZOS)
+    
+    width, height = video_size
+    stacked = np.vstack([np.asarray(base_frame), np.asarray(quote_frame)])
+    
+    # Quote fades in from black after the delay and is centred over the base frame
+    filtergraph = (
+        f"[0:v]loop=loop=-1:size=1:start=0,split[base_src][quote_src];"
+        f"[base_src]crop={width}:{height}:0:0[base];"
+        f"[quote_src]crop={width}:{quote_height}:0:{height},"
+        f"fade=t=in:st={fade_in_delay}:d={fade_in_duration}[quote];"
+        f"[base][quote]overlay=x=(W-w)/2:y=(H-h)/2:enable='gte(t,{fade_in_delay})',"
+        f"format=yuv420p[video]"
+    )
+    
+    print("🎬 Encoding video...")
+    command = [
+        FFMPEG_BINARY, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{stacked.shape[0]}",
+        "-framerate", str(VIDEO_FPS), "-i", "pipe:0",
+        "-i", audio_track,
+        "-filter_complex", filtergraph,
+        "-map", "[video]", "-map", "1:a",
+        "-t", f"{video_duration:.3f}",
+        "-c:v", "libx264", "-preset", VIDEO_X264_PRESET, "-r", str(VIDEO_FPS),
+        "-c:a", "copy",
+        "-threads", str(RENDER_FFMPEG_THREADS)
+    ]
+    
+    if upload_blob_path:
+        blob_client = get_blob_service_client().get_blob_client(AZURE_CONTAINER_NAME, upload_blob_path)
+        return _encode_to_blob(command, stacked.tobytes(), BlockBlobStream(blob_client, "video/mp4"))
+    return _encode_to_scratch(command, stacked.tobytes())
+
+
+def render_composite_video_file(image_data: bytes, banner_frame: np.ndarray, audio_path: str,
+                                video_size: Tuple[int, int], fade_in_delay: float,
+                                fade_in_duration: float) -> RenderedVideo:
+    """Compose the video layer by layer with MoviePy (general, slower path; MoviePy needs an output file)"""
+    final_video = None
+    output_path = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4', dir=VIDEO_SCRATCH_DIR).name
+    
+    try:
+        print("🔊 Loading cached audio track and setting up video...")
+        audio_track, video_duration = audio_cache.get(audio_path)
+        print(f"⏱️ Video duration: {video_duration} seconds")
+        
+        # Background
+        background_clip = ColorClip(
+            size=video_size, 
+            color=BACKGROUND_COLOR
+        ).with_duration(video_duration)
+        
+        # Banner positioned above the quote
+        banner_y = BANNER_Y_POSITION
+        
+        # Create banner clip from the cached banner frame
+        banner_clip = (
+            ImageClip(banner_frame)
+            .with_duration(video_duration)
+            .with_position(("center", banner_y))
+        )
+        
+        # Quote image fades in after delay
+        print("🖼️ Creating quote image clip...")
+        quote_clip = (
+            ImageClip(np.array(Image.open(BytesIO(image_data)).convert("RGB")))
+            .with_duration(video_duration - fade_in_delay)
+            .with_start(fade_in_delay)
+            .resized(width=video_size[0])
+            .with_position("center")
+            .with_effects([FadeIn(fade_in_duration)])
+        )
+        
+        # Final composition
+        print("🎬 Compositing video...")
+        layers = [background_clip, banner_clip, quote_clip]
+        final_video = CompositeVideoClip(layers).with_duration(video_duration)
+        
+        # MoviePy defaults audio_codec to libmp3lame, which would re-encode the cached
+        # AAC track; "copy" muxes it as is
+        final_video.write_videofile(
+            output_path, 
+            codec="libx264", 
+            audio=audio_track, 
+            audio_codec="copy",
+            fps=VIDEO_FPS,
+            threads=RENDER_FFMPEG_THREADS
+        )
+        
+        return RenderedVideo(path=output_path, size=os.path.getsize(output_path))
+    
+    except BaseException:
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+        raise
+    
+    finally:
+        if final_video:
+            final_video.close()
+
+
+def render_video_file(image_data: bytes, banner_frame: np.ndarray, audio_path: str,
+                      video_size: Tuple[int, int], fade_in_delay: float, fade_in_duration: float,
+                      upload_blob_path: Optional[str] = None) -> RenderedVideo:
+    """
+    Compose and encode a quote video.
+    
+    Module-level so it can be pickled and executed in the render process pool. With
+    upload_blob_path (fast path only), the video is uploaded to that blob while it is
+    being encoded.
+    """
+    if VIDEO_FAST_RENDER:
+        return render_static_video_file(
+            image_data, banner_frame, audio_path,
+            video_size, fade_in_delay, fade_in_duration, upload_blob_path
+        )
+    return render_composite_video_file(
+        image_data, banner_frame, audio_path,
+        video_size, fade_in_delay, fade_in_duration
+    )
 
 
 class QuoteVideoGenerator:
@@ -34,8 +295,8 @@ class QuoteVideoGenerator:
         self.container_name = AZURE_CONTAINER_NAME
         self.video_folder = AZURE_VIDEO_FOLDER
         
-        # Initialize blob service client
-        self.blob_service_client = BlobServiceClient.from_connection_string(self.connection_string)
+        # Shared blob service client (pooled connections)
+        self.blob_service_client = get_blob_service_client()
         self.container_client = self.blob_service_client.get_container_client(self.container_name)
         
         # Video settings
@@ -45,228 +306,90 @@ class QuoteVideoGenerator:
         self.fade_in_delay = FADE_IN_DELAY
         self.fade_in_duration = FADE_IN_DURATION
         
-    async def _download_image_from_url(self, image_url: str) -> str:
-        """Download image from URL to temporary file asynchronously"""
+    async def _download_image_from_url(self, image_url: str) -> bytes:
+        """Download image bytes from URL asynchronously"""
         try:
-            loop = asyncio.get_event_loop()
-            # Run the blocking requests call in a thread pool
-            response = await loop.run_in_executor(None, lambda: requests.get(image_url, timeout=30))
+            response = await get_async_client().get(image_url, timeout=30)
             response.raise_for_status()
             
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpeg')
-            temp_file.write(response.content)
-            temp_file.close()
-            
-            return temp_file.name
+            return response.content
         except Exception as e:
             raise Exception(f"Failed to download image from URL: {str(e)}")
     
-    def _load_font(self, size: int):
-        """Load font with fallback to default"""
-        font_paths = [
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-            "/usr/share/fonts/truetype/dejavu/DejaVu-Sans-Bold.ttf"
-        ]
-        
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    return ImageFont.truetype(font_path, size)
-                except:
-                    continue
-        
-        # Fallback to default font
-        return ImageFont.load_default()
-    
-    def _wrap_text(self, text: str, font, draw, max_width: int, margin: int = 40):
-        """Wrap text to fit within max_width"""
-        words = text.split()
-        lines = []
-        line = ""
-        
-        for word in words:
-            test_line = f"{line} {word}".strip()
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            text_width = bbox[2] - bbox[0]
-            
-            if text_width <= max_width - 2 * margin:
-                line = test_line
-            else:
-                if line:  # Only add line if it's not empty
-                    lines.append(line)
-                    line = word
-                else:  # Single word is too long, add it anyway
-                    lines.append(word)
-                    line = ""
-        
-        if line:
-            lines.append(line)
-        
-        return lines
-    
-    def _get_best_font(self, text: str, draw, max_width: int, max_height: int, margin: int = 40, line_spacing: int = 10):
-        """Find the best font size that fits the text within dimensions"""
-        for size in range(100, 8, -2):  # Go down to size 8, step by 2 for faster processing
-            font = self._load_font(size)
-            lines = self._wrap_text(text, font, draw, max_width, margin)
-            
-            # Calculate actual text height for each line
-            line_heights = []
-            for line in lines:
-                bbox = draw.textbbox((0, 0), line, font=font)
-                line_height = bbox[3] - bbox[1]  # Actual height of text
-                line_heights.append(line_height)
-            
-            total_height = sum(line_heights) + (len(lines) - 1) * line_spacing
-            
-            if total_height <= max_height - 2 * margin:
-                return font, lines
-        
-        # Final fallback with smallest possible font
-        return self._load_font(8), self._wrap_text(text, self._load_font(8), draw, max_width, margin)
-    
-    async def _create_title_banner(self, text: str, width: int = None, height: int = None) -> str:
+    async def _create_title_banner(self, text: str, width: int = None, height: int = None) -> np.ndarray:
         """
-        Create a title banner image using PIL and save to a temporary file.
-        Dynamically adjusts banner height to fit text content.
+        Create a title banner frame (RGB numpy array) using PIL.
+        Dynamically adjusts banner height to fit text content; repeated titles come from the banner cache.
         """
         loop = asyncio.get_event_loop()
         
+        banner_width = width or self.video_size[0]
+        
+        # Settings
+        bg_color = BANNER_COLOR
+        text_color = TITLE_COLOR
+        margin = 40
+        line_spacing = 10
+        min_banner_height = 100  # Minimum banner height
+        max_banner_height = 400  # Maximum banner height
+        
+        key = banner_key(
+            text=text, width=banner_width, height=height, bg_color=bg_color, text_color=text_color,
+            font=FONT_PATHS, margin=margin, line_spacing=line_spacing,
+            min_height=min_banner_height, max_height=max_banner_height
+        )
+        
         def create_banner():
-            banner_width = width or self.video_size[0]
-            
-            # Settings
-            bg_color = BANNER_COLOR
-            text_color = TITLE_COLOR
-            margin = 40
-            line_spacing = 10
-            min_banner_height = 100  # Minimum banner height
-            max_banner_height = 400  # Maximum banner height
-            
-            # Create a temporary image for text measurement
-            temp_image = Image.new("RGB", (banner_width, 100), bg_color)
-            draw = ImageDraw.Draw(temp_image)
-            
-            # Start with a reasonable font size and find the best fit
-            optimal_font_size = 40
-            for size in range(60, 20, -2):  # Start from 60, go down to 20
-                font = self._load_font(size)
-                lines = self._wrap_text(text, font, draw, banner_width, margin)
-                
-                # Calculate total height needed for this font size
-                line_heights = []
-                for line in lines:
-                    bbox = draw.textbbox((0, 0), line, font=font)
-                    line_height = bbox[3] - bbox[1]
-                    line_heights.append(line_height)
-                
-                total_text_height = sum(line_heights) + (len(lines) - 1) * line_spacing
-                needed_height = total_text_height + 2 * margin
-                
-                # Check if this font size gives us a reasonable banner height
-                if needed_height <= max_banner_height:
-                    optimal_font_size = size
-                    break
-            
-            # Now create the banner with the optimal font size
-            font = self._load_font(optimal_font_size)
-            lines = self._wrap_text(text, font, draw, banner_width, margin)
-            
-            # Calculate the actual banner height needed
-            line_heights = []
-            for line in lines:
-                bbox = draw.textbbox((0, 0), line, font=font)
-                line_height = bbox[3] - bbox[1]
-                line_heights.append(line_height)
-            
-            total_text_height = sum(line_heights) + (len(lines) - 1) * line_spacing
+            # Largest font (up to 60) that fits the fixed height, or the maximum dynamic height
+            fitted = fit_text(
+                text, banner_width, height or max_banner_height,
+                min_size=12, max_size=60, margin=margin, line_spacing=line_spacing
+            )
             
             # Use custom height if provided, otherwise calculate based on text
             if height:
                 banner_height = height
             else:
                 # Dynamic height with padding
-                banner_height = max(min_banner_height, min(max_banner_height, total_text_height + 2 * margin))
+                banner_height = max(min_banner_height, min(max_banner_height, fitted.total_height + 2 * margin))
             
-            # Create the actual banner image
+            # Create the actual banner image with each line centered
             image = Image.new("RGB", (banner_width, banner_height), bg_color)
-            draw = ImageDraw.Draw(image)
-            
-            # If text still doesn't fit, reduce font size further
-            while total_text_height > banner_height - 2 * margin and optimal_font_size > 12:
-                optimal_font_size -= 2
-                font = self._load_font(optimal_font_size)
-                lines = self._wrap_text(text, font, draw, banner_width, margin)
-                line_heights = []
-                for line in lines:
-                    bbox = draw.textbbox((0, 0), line, font=font)
-                    line_height = bbox[3] - bbox[1]
-                    line_heights.append(line_height)
-                total_text_height = sum(line_heights) + (len(lines) - 1) * line_spacing
-            
-            # Compute starting Y position for vertical centering
-            y = (banner_height - total_text_height) // 2
-            
-            # Draw each line centered
-            for i, line in enumerate(lines):
-                bbox = draw.textbbox((0, 0), line, font=font)
-                line_width = bbox[2] - bbox[0]
-                x = (banner_width - line_width) // 2
-                draw.text((x, y), line, fill=text_color, font=font)
-                y += line_heights[i] + line_spacing
-            
-            # Save image
-            temp_banner_path = tempfile.NamedTemporaryFile(delete=False, suffix='.png').name
-            image.save(temp_banner_path)
-            return temp_banner_path
+            draw_centered(ImageDraw.Draw(image), fitted, banner_width, banner_height, text_color)
+            return np.array(image)
         
-        # Run banner creation in thread pool
-        return await loop.run_in_executor(None, create_banner)
+        # Run banner creation (or the disk cache read) in thread pool
+        return await loop.run_in_executor(None, banner_cache.get_or_render, key, create_banner)
 
     
-    async def _upload_video_to_blob(self, video_path: str, filename: str) -> str:
+    async def _upload_video_to_blob(self, video: RenderedVideo, filename: str) -> str:
         """Upload video file to Azure Blob Storage asynchronously"""
         try:
-            loop = asyncio.get_event_loop()
-            
-            # Create blob path with folder
             blob_path = f"{self.video_folder}/{filename}"
             
-            # Upload the video
-            blob_client = self.container_client.get_blob_client(blob_path)
-            
-            # Run the blocking upload operation in a thread pool
-            def upload_blob():
-                with open(video_path, 'rb') as video_file:
-                    blob_client.upload_blob(video_file, overwrite=True)
-            
-            await loop.run_in_executor(None, upload_blob)
-            
-            # Return the blob URL
-            blob_url = f"https://{self.blob_service_client.account_name}.blob.core.windows.net/{self.container_name}/{blob_path}"
-            return blob_url
+            if video.data is not None:
+                return await get_blob_uploader().aupload(blob_path, video.data, "video/mp4", length=video.size)
+            with open(video.path, 'rb') as video_file:
+                return await get_blob_uploader().aupload(blob_path, video_file, "video/mp4", length=video.size)
             
         except Exception as e:
             raise Exception(f"Failed to upload video to blob storage: {str(e)}")
     
-    async def generate_quote_video(self, image_url: str, quote_title: str = None) -> Tuple[str, str]:
+    async def render_quote_video(self, image_url: str, quote_title: str = None,
+                                 progress: Optional[Callable[[str, float], None]] = None,
+                                 image_bytes: Optional[bytes] = None) -> Tuple[str, RenderedVideo]:
         """
-        Generate a quote video with the given image and upload to Azure Blob Storage
+        Render a quote video without uploading it
         
         Args:
             image_url: URL of the quote image (from blob storage)
             quote_title: The AI-generated quote title to use in the video
+            progress: Optional callback receiving (stage, fraction) updates
+            image_bytes: The image itself, when already in memory; skips downloading image_url
             
         Returns:
-            Tuple of (video_filename, video_blob_url)
+            Tuple of (video_filename, rendered_video); the caller owns (and discards) the video
         """
-        temp_image_path = None
-        temp_video_path = None
-        temp_banner_path = None
-        audio_clip = None
-        final_video = None
-        
         try:
             # Check if audio file exists
             if not os.path.exists(self.audio_file):
@@ -274,106 +397,145 @@ class QuoteVideoGenerator:
             
             print(f"🎵 Audio file found: {self.audio_file}")
             
-            # Run image download and banner creation concurrently
+            # Run image download (if needed) and banner creation concurrently
+            if progress:
+                progress("video_prepare", 0.4)
             print("� Starting parallel operations...")
             title_text = quote_title if quote_title else self.title_text
             
-            # Execute download and banner creation in parallel
-            download_task = self._download_image_from_url(image_url)
             banner_task = self._create_title_banner(title_text)
             
-            temp_image_path, temp_banner_path = await asyncio.gather(
-                download_task,
-                banner_task
-            )
+            if image_bytes is None:
+                # Execute download and banner creation in parallel
+                download_task = self._download_image_from_url(image_url)
+                image_bytes, banner_frame = await asyncio.gather(
+                    download_task,
+                    banner_task
+                )
+                print(f"🖼️ Image downloaded ({len(image_bytes)} bytes)")
+            else:
+                banner_frame = await banner_task
+                print(f"🖼️ Using in-memory image ({len(image_bytes)} bytes)")
             
-            print(f"🖼️ Image downloaded to: {temp_image_path}")
-            print(f"📝 Title banner created: {temp_banner_path}")
+            print(f"📝 Title banner ready: {banner_frame.shape[1]}x{banner_frame.shape[0]}")
 
-            print("🔊 Loading audio and setting up video...")
-            audio_clip = AudioFileClip(self.audio_file)
-            video_duration = audio_clip.duration
-            print(f"⏱️ Video duration: {video_duration} seconds")
-            
-            # Background
-            background_clip = ColorClip(
-                size=self.video_size, 
-                color=BACKGROUND_COLOR
-            ).with_duration(video_duration)
-            
-            # Banner positioned above the quote
-            banner_y = BANNER_Y_POSITION
-            
-            # Create banner clip from PIL-generated image
-            banner_clip = (
-                ImageClip(temp_banner_path)
-                .with_duration(video_duration)
-                .with_position(("center", banner_y))
-            )
-            
-            # Quote image fades in after delay
-            print("🖼️ Creating quote image clip...")
-            quote_clip = (
-                ImageClip(temp_image_path)
-                .with_duration(video_duration - self.fade_in_delay)
-                .with_start(self.fade_in_delay)
-                .resized(width=self.video_size[0])
-                .with_position("center")
-                .with_effects([FadeIn(self.fade_in_duration)])
-            )
-            
-            # Final composition
-            print("🎬 Compositing video...")
-            layers = [background_clip, banner_clip, quote_clip]
-            final_video = CompositeVideoClip(layers).with_audio(audio_clip)
-            
             # Generate unique filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             unique_id = str(uuid.uuid4())[:8]
             video_filename = f"quote_video_{timestamp}_{unique_id}.mp4"
             
-            # Create temporary output file
-            temp_video_path = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4').name
-            
-            # Export video asynchronously
-            print(f"💾 Writing video to temporary file...")
-            loop = asyncio.get_event_loop()
-            
-            # Run video export in thread pool to avoid blocking
-            def export_video():
-                final_video.write_videofile(
-                    temp_video_path, 
-                    codec="libx264", 
-                    audio_codec="aac", 
-                    fps=VIDEO_FPS
-                )
+            # Render in the dedicated process pool (queues when all workers are busy)
+            if progress:
+                progress("video_render", 0.5)
+            # Composite renders need an output file, so only the fast path can stream
+            stream_blob_path = None
+            if VIDEO_STREAM_UPLOAD and VIDEO_FAST_RENDER:
+                stream_blob_path = f"{self.video_folder}/{video_filename}"
+                print("💾 Rendering video and streaming it to Azure Blob Storage...")
+            else:
+                print("💾 Rendering video...")
+            rendered = await render_pool.run(
+                render_video_file,
+                image_bytes,
+                banner_frame,
+                self.audio_file,
+                self.video_size,
+                self.fade_in_delay,
+                self.fade_in_duration,
+                stream_blob_path
+            )
             
-            await loop.run_in_executor(None, export_video)
+            if rendered.uploaded:
+                print(f"📦 Rendered and uploaded {rendered.size} bytes")
+            else:
+                print(f"📦 Rendered {rendered.size} bytes {'in memory' if rendered.data is not None else 'to scratch file'}")
+            return video_filename, rendered
             
-            # Upload to Azure Blob Storage
+        except Exception as e:
+            raise Exception(f"Video rendering failed: {str(e)}")
+    
+    async def upload_quote_video(self, video: RenderedVideo, video_filename: str,
+                                 progress: Optional[Callable[[str, float], None]] = None) -> str:
+        """Upload a rendered video to Azure Blob Storage and discard the local copy (streamed videos are already there)"""
+        if video.uploaded:
+            return get_blob_uploader().url(f"{self.video_folder}/{video_filename}")
+        try:
+            if progress:
+                progress("video_upload", 0.9)
             print("☁️ Uploading video to Azure Blob Storage...")
-            video_blob_url = await self._upload_video_to_blob(temp_video_path, video_filename)
+            return await self._upload_video_to_blob(video, video_filename)
+        finally:
+            video.discard()
+    
+    def video_cache_key(self, image_bytes: bytes, quote_title: Optional[str] = None) -> str:
+        """Content address of the video rendered from these inputs with the current template"""
+        audio_stat = os.stat(self.audio_file)
+        return asset_key(
+            "video",
+            image=image_bytes,
+            title=quote_title if quote_title else self.title_text,
+            audio=(os.path.abspath(self.audio_file), audio_stat.st_mtime_ns, audio_stat.st_size),
+            template=(
+                self.video_size, self.fade_in_delay, self.fade_in_duration, VIDEO_FPS,
+                BACKGROUND_COLOR, BANNER_COLOR, BANNER_HEIGHT, BANNER_Y_POSITION,
+                TITLE_FONT_SIZE, TITLE_COLOR, WIDTH, HEIGHT, VIDEO_FAST_RENDER, VIDEO_X264_PRESET
+            )
+        )
+    
+    async def generate_quote_video(self, image_url: str, quote_title: str = None,
+                                   progress: Optional[Callable[[str, float], None]] = None,
+                                   image_bytes: Optional[bytes] = None,
+                                   force: bool = False,
+                                   render_limit: Optional[asyncio.Semaphore] = None,
+                                   upload_limit: Optional[asyncio.Semaphore] = None) -> Tuple[str, str]:
+        """
+        Generate a quote video with the given image and upload to Azure Blob Storage
+        
+        Args:
+            image_url: URL of the quote image (from blob storage)
+            quote_title: The AI-generated quote title to use in the video
+            progress: Optional callback receiving (stage, fraction) updates
+            image_bytes: The image itself, when already in memory; skips downloading image_url
+            force: Render a new video even if identical inputs were rendered before
+            render_limit: Optional semaphore held while rendering (e.g. a pipeline stage limit)
+            upload_limit: Optional semaphore held while uploading
+            
+        Returns:
+            Tuple of (video_filename, video_blob_url)
+        """
+        try:
+            # The cache key covers the image content, so it has to be in memory first
+            if image_bytes is None:
+                image_bytes = await self._download_image_from_url(image_url)
+            
+            loop = asyncio.get_running_loop()
+            cache_key = self.video_cache_key(image_bytes, quote_title)
+            cached = None if force else await loop.run_in_executor(None, get_asset_cache().get, cache_key)
+            if cached is not None:
+                print(f"♻️ Reusing cached video: {cached['url']}")
+                return cached["filename"], cached["url"]
+            
+            async with render_limit or nullcontext():
+                video_filename, rendered = await self.render_quote_video(
+                    image_url, quote_title, progress, image_bytes
+                )
+            video_size = rendered.size
+            async with upload_limit or nullcontext():
+                video_blob_url = await self.upload_quote_video(rendered, video_filename, progress)
+            await loop.run_in_executor(
+                None, get_asset_cache().put, cache_key, "video", video_filename, video_blob_url, video_size
+            )
             
             print("✅ Video created and uploaded successfully!")
             return video_filename, video_blob_url
             
         except Exception as e:
             raise Exception(f"Video generation failed: {str(e)}")
-        
-        finally:
-            # Clean up temporary files and resources
-            if temp_image_path and os.path.exists(temp_image_path):
-                os.unlink(temp_image_path)
-            if temp_banner_path and os.path.exists(temp_banner_path):
-                os.unlink(temp_banner_path)
-            if temp_video_path and os.path.exists(temp_video_path):
-                os.unlink(temp_video_path)
-            if audio_clip:
-                audio_clip.close()
-            if final_video:
-                final_video.close()
     
-    async def generate_quote_video_safe(self, image_url: str, quote_title: str = None) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    async def generate_quote_video_safe(self, image_url: str, quote_title: str = None,
+                                        progress: Optional[Callable[[str, float], None]] = None,
+                                        image_bytes: Optional[bytes] = None,
+                                        force: bool = False) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """
         Safe version of generate_quote_video that returns error instead of raising
         
@@ -383,7 +545,7 @@ class QuoteVideoGenerator:
         try:
             print(f"🎬 Starting video generation with image URL: {image_url}")
             print(f"📝 Using title: {quote_title}")
-            filename, blob_url = await self.generate_quote_video(image_url, quote_title)
+            filename, blob_url = await self.generate_quote_video(image_url, quote_title, progress, image_bytes, force)
             print(f"✅ Video generation completed: {filename}")
             return filename, blob_url, None
         except Exception as e: